@@ -3,6 +3,7 @@ import re
 from datetime import datetime
 from django.core.management.base import BaseCommand, CommandError
 from job_search.models import Job
+from job_search.services.filtering import bump_jobs_version
 
 
 class Command(BaseCommand):
@@ -120,6 +121,9 @@ class Command(BaseCommand):
                 )
                 skipped_count += 1
 
+        if created_count or updated_count:
+            bump_jobs_version()
+
         self.stdout.write('\n' + '=' * 50)
         self.stdout.write(self.style.SUCCESS(f'Created: {created_count} jobs'))
         self.stdout.write(self.style.WARNING(f'Updated: {updated_count} jobs'))
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(
+                fields=['stipend_currency', 'stipend_min', 'stipend_max'],
+                name='job_search_stipend_range_idx',
+            ),
+        ),
+    ]
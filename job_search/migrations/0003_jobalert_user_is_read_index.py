@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_search', '0002_job_stipend_range_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobalert',
+            index=models.Index(fields=['user', 'is_read'], name='job_search_alert_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_search', '0003_jobalert_user_is_read_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matchingresult',
+            index=models.Index(fields=['run', 'selection_probability'], name='job_search_result_score_idx'),
+        ),
+    ]
@@ -117,6 +117,10 @@ class Job(models.Model):
             models.Index(fields=['location']),
             models.Index(fields=['experience_level']),
             models.Index(fields=['published_at']),
+            models.Index(
+                fields=['stipend_currency', 'stipend_min', 'stipend_max'],
+                name='job_search_stipend_range_idx',
+            ),
         ]
 
     def __str__(self):
@@ -259,6 +263,9 @@ class MatchingResult(models.Model):
             models.UniqueConstraint(fields=['run', 'rank'], name='unique_rank_per_run'),
             models.UniqueConstraint(fields=['run', 'job'], name='unique_job_per_run'),
         ]
+        indexes = [
+            models.Index(fields=['run', 'selection_probability'], name='job_search_result_score_idx'),
+        ]
 
 
 class PreferenceChangeLog(models.Model):
@@ -333,6 +340,7 @@ class JobAlert(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['is_read']),
+            models.Index(fields=['user', 'is_read'], name='job_search_alert_unread_idx'),
         ]
 
 
@@ -0,0 +1,26 @@
+"""JSON renderers for the job search API."""
+
+from decimal import Decimal
+
+import orjson
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+
+def _orjson_default(value):
+    # Mirror DRF's encoder for the types orjson does not handle natively.
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Promise):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Render response data with orjson, skipping DRF's pure-Python JSON encoder."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Non-string keys are stringified, as the stdlib encoder would do.
+        return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,12 +1,62 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
 
 from job_search.models import Job
 
 MAX_AGENT_JOBS = 300
+_JOBS_VERSION_KEY = 'filter_jobs:version'
+
+
+def bump_jobs_version():
+    """Invalidate cached filter_jobs outcomes; call after writing Job rows."""
+    try:
+        cache.incr(_JOBS_VERSION_KEY)
+    except ValueError:
+        cache.set(_JOBS_VERSION_KEY, 1, timeout=None)
+
+
+def _filter_cache_key(preferences):
+    digest = hashlib.blake2b(
+        json.dumps(preferences, sort_keys=True, default=str).encode(),
+        digest_size=16,
+    ).hexdigest()
+    version = cache.get_or_set(_JOBS_VERSION_KEY, 0, timeout=None)
+    return f'filter_jobs:{digest}:{version}'
 
 
 def filter_jobs(preferences):
-    """Apply deterministic filters and return top jobs plus metrics."""
+    """Apply deterministic filters and return top jobs plus metrics.
+
+    When FILTER_JOBS_CACHE_SECONDS is set, the outcome is cached per
+    normalized preferences and Job version; writers that change Job rows call
+    bump_jobs_version() so new jobs are picked up immediately.
+    """
+    timeout = getattr(settings, 'FILTER_JOBS_CACHE_SECONDS', 0)
+    if timeout > 0:
+        cached = cache.get_or_set(
+            _filter_cache_key(preferences),
+            lambda: _apply_filters(preferences),
+            timeout=timeout,
+        )
+    else:
+        cached = _apply_filters(preferences)
+
+    selected_job_ids = cached['job_ids']
+    capped_jobs = Job.objects.filter(id__in=selected_job_ids).order_by('-published_at', '-created_at')
+    return {
+        'jobs': capped_jobs,
+        'job_ids': list(selected_job_ids),
+        'total_considered': cached['total_considered'],
+        # Callers store the metrics on the run, so hand out a copy of the cached dict.
+        'deterministic_metrics': dict(cached['deterministic_metrics']),
+    }
+
+
+def _apply_filters(preferences):
     jobs = Job.objects.all()
     metrics = {
         'initial_count': jobs.count(),
@@ -29,12 +79,13 @@ def filter_jobs(preferences):
     stipend_currency = preferences.get('stipend_currency', 'INR')
 
     if stipend_min is not None and stipend_max is not None:
+        # Overlap test in one WHERE clause; backed by job_search_stipend_range_idx.
         jobs = jobs.filter(
+            stipend_currency=stipend_currency,
             stipend_min__isnull=False,
             stipend_max__isnull=False,
-            stipend_currency=stipend_currency,
-        ).filter(
-            Q(stipend_max__gte=stipend_min) & Q(stipend_min__lte=stipend_max)
+            stipend_min__lte=stipend_max,
+            stipend_max__gte=stipend_min,
         )
         metrics['after_stipend_overlap'] = jobs.count()
 
@@ -81,9 +132,7 @@ def filter_jobs(preferences):
     selected_job_ids = list(ordered_jobs.values_list('id', flat=True)[:MAX_AGENT_JOBS])
     metrics['capped_count'] = len(selected_job_ids)
 
-    capped_jobs = Job.objects.filter(id__in=selected_job_ids).order_by('-published_at', '-created_at')
     return {
-        'jobs': capped_jobs,
         'job_ids': selected_job_ids,
         'total_considered': full_count,
         'deterministic_metrics': metrics,
@@ -2,12 +2,18 @@ from copy import deepcopy
 from decimal import Decimal
 
 
+def normalize_location(location):
+    """Normalize a location the way normalize_preferences stores it."""
+    if isinstance(location, str):
+        return location.strip().lower()
+    return location
+
+
 def normalize_preferences(preferences):
     """Normalize preference payload for deterministic filtering and persistence."""
     normalized = deepcopy(preferences)
-    location = normalized.get('location')
-    if isinstance(location, str):
-        normalized['location'] = location.strip().lower()
+    if 'location' in normalized:
+        normalized['location'] = normalize_location(normalized['location'])
 
     if not normalized.get('stipend_currency'):
         normalized['stipend_currency'] = 'INR'
@@ -1,13 +1,15 @@
 from celery import shared_task
 from django.utils import timezone
 
-from job_search.models import CandidateRankingRun, MatchingRun
-from job_search.services.matching_orchestrator import run_matching_for_run
+from job_search.models import (
+    CandidateRankingRun,
+    Job,
+    JobAlert,
+    JobPreference,
+    MatchingRun,
+    PreferenceChangeLog,
+)
 from job_search.services.candidate_ranking.orchestrator import run_candidate_ranking_for_run
-from job_search.models import Job, JobAlert, JobPreference, MatchingRun
-from job_search.services.filtering import filter_jobs
-from job_search.services.matching_orchestrator import run_matching_for_run
-from job_search.models import Job, JobAlert, JobPreference, MatchingRun
 from job_search.services.filtering import filter_jobs
 from job_search.services.matching_orchestrator import run_matching_for_run
 from job_search.services.preferences import normalize_preferences
@@ -53,6 +55,31 @@ def run_candidate_ranking_pipeline(self, run_id):
         ranking_run.error_message = str(exc)
         ranking_run.save(update_fields=['status', 'error_code', 'error_message', 'updated_at'])
         raise
+
+
+@shared_task(ignore_result=True)
+def log_preference_change(user_id, preference_id, action, preference_name, before, after):
+    """Write the PreferenceChangeLog row for a preference mutation, off the request path."""
+    changes = {}
+    for key, new_val in after.items():
+        old_val = before.get(key)
+        if old_val != new_val:
+            changes[key] = {'old': old_val, 'new': new_val}
+    # Keys only present before the change (e.g. a delete with no after snapshot).
+    for key in before.keys() - after.keys():
+        if before[key] is not None:
+            changes[key] = {'old': before[key], 'new': None}
+    PreferenceChangeLog.objects.create(
+        user_id=user_id,
+        preference_id=preference_id,
+        action=action,
+        preference_name=preference_name,
+        snapshot_before=before,
+        snapshot_after=after,
+        changes=changes,
+    )
+
+
 @shared_task(bind=True, soft_time_limit=300)
 def check_new_job_alerts(self, lookback_hours=24):
     """Check recently added jobs against all active preferences and create alerts."""
@@ -65,6 +92,7 @@ def check_new_job_alerts(self, lookback_hours=24):
         return {'alerts_created': 0, 'preferences_checked': 0}
 
     active_preferences = JobPreference.objects.filter(is_active=True).select_related('user')
+    recent_ids = list(recent_jobs.values_list('id', flat=True))
     alerts_created = 0
     preferences_checked = 0
 
@@ -93,12 +121,9 @@ def check_new_job_alerts(self, lookback_hours=24):
         except Exception:
             continue
 
-        matched_jobs = result['jobs']
-        recent_ids = set(recent_jobs.values_list('id', flat=True))
+        # Only recent matches can raise alerts, and scoring reads just these columns.
+        matched_jobs = result['jobs'].filter(id__in=recent_ids).only('id', 'title', 'company_name')
         for job in matched_jobs:
-            if job.id not in recent_ids:
-                continue
-
             score = 0.5
             reasons = ['Passed all preference filters']
 
@@ -1,19 +1,101 @@
+"""
+Tests for the job_search app.
+
+Run against the in-memory test database with:
+    python manage.py test job_search --settings=job_search_backend.test_settings
+
+Test classes are kept small and independent so they can be spread across
+workers with ``--parallel auto``.
+
+For repeated local runs, put the test database on disk so --keepdb has
+something to keep between runs:
+    TEST_DATABASE_IN_MEMORY=false python manage.py test job_search \
+        --settings=job_search_backend.test_settings --keepdb
+
+Tests here must not change the schema or rely on TransactionTestCase, so a
+kept database stays valid from one run to the next.
+"""
+
 import json
+from dataclasses import asdict, dataclass, replace
 from unittest.mock import MagicMock, patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.test.utils import override_settings
-from django.urls import reverse
+from django.urls import reverse, reverse_lazy
 from rest_framework.test import APIClient
 
-from .models import Job, JobPreference, MatchingRun
+from .models import Job, JobAlert, JobPreference, MatchingRun, PreferenceChangeLog
+from .services.agents.orchestrator import run_agent_pipeline
+from .services.filtering import bump_jobs_version, filter_jobs
+from .services.openai_client import is_gpt_scoring_enabled
+from .services.preferences import normalize_preferences
+from .tasks import log_preference_change, run_matching_pipeline
+from .views import MAX_MARK_READ_ALERT_IDS, MatchedJobsPagination
+
+_MATCH_PAYLOAD_BASE = {
+    'preferences': {
+        'work_mode': 'REMOTE',
+        'employment_type': 'FULL_TIME',
+        'location': 'bangalore',
+        'company_size_preference': 'STARTUP',
+    },
+}
+
+
+@dataclass(frozen=True)
+class _RunPreferences:
+    work_mode: str = 'REMOTE'
+    employment_type: str = 'INTERNSHIP'
+    internship_duration_weeks: int = 12
+    location: str = 'Bangalore'
+    company_size_preference: str = 'STARTUP'
+    stipend_min: str = '9000.00'
+    stipend_max: str = '20000.00'
+    stipend_currency: str = 'INR'
+    save_preference: bool = True
+
+
+_BASE_RUN_PREFS = _RunPreferences()
+_BASE_CANDIDATE_PROFILE = {
+    'career_stage': 'EARLY',
+    'risk_tolerance': 'LOW',
+}
+_RUN_PAYLOAD_BASE = {
+    'preferences': asdict(_BASE_RUN_PREFS),
+    'candidate_profile': _BASE_CANDIDATE_PROFILE,
+}
+
+
+def _fake_agent_pipeline(jobs, preferences, candidate_profile=None):
+    """Deterministic stand-in for run_agent_pipeline: ranks jobs in the order given."""
+    top_jobs = [
+        {
+            'job_id': job.id,
+            'rank': rank,
+            'selection_probability': 0.5,
+            'fit_score': 0.5,
+            'job_quality_score': 0.5,
+            'why': 'Stubbed pipeline',
+            'agent_trace': {'scoring_method': 'stub'},
+        }
+        for rank, job in enumerate(jobs, start=1)
+    ]
+    return {'top_jobs': top_jobs, 'total_ranked': len(top_jobs), 'gpt_metrics': {}}
 
 
 class JobPreferenceModelTests(TestCase):
-    def setUp(self):
-        self.user = get_user_model().objects.create_user(
+    """
+    full_clean() checks that the user exists and evaluates the model constraints
+    against the database, so these tests need a real TestCase, not SimpleTestCase.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             username='model-user',
             email='model@example.com',
             password='password123',
@@ -83,517 +165,531 @@ class JobPreferenceModelTests(TestCase):
 
 
 class PreferencesViewTests(TestCase):
-    def setUp(self):
-        self.user = get_user_model().objects.create_user(
+    url = reverse_lazy('preferences')
+
+    _BASE_PAYLOAD = {
+        'work_mode': 'REMOTE',
+        'employment_type': 'FULL_TIME',
+        'location': 'Bangalore',
+        'company_size_preference': 'STARTUP',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             username='pref-user',
             email='pref@example.com',
             password='password123',
         )
-        self.client = APIClient()
-        self.url = reverse('preferences')
 
-    def test_unauthenticated_returns_401(self):
-        response = self.client.get(self.url)
-        self.assertEqual(response.status_code, 401)
+    def setUp(self):
+        # Clients are cheap to build; setUpTestData would deep-copy one per test.
+        self.auth_client = APIClient()
+        self.auth_client.force_authenticate(user=self.user)
+
+    def _post(self, **overrides):
+        return self.auth_client.post(self.url, data={**self._BASE_PAYLOAD, **overrides}, format='json')
 
     def test_get_empty_preference(self):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.get(self.url)
+        response = self.auth_client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertIsNone(response.data['preference'])
 
     def test_post_creates_preference(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post()
         self.assertEqual(response.status_code, 200)
         self.assertIn('preference', response.data)
         self.assertEqual(JobPreference.objects.filter(user=self.user, is_active=True).count(), 1)
 
     def test_get_returns_saved_preference(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-        }
-        self.client.post(self.url, data=payload, format='json')
-        response = self.client.get(self.url)
+        self._post()
+        with self.assertNumQueries(1):
+            response = self.auth_client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['preference']['work_mode'], 'REMOTE')
 
+    @patch('job_search.views.log_preference_change.delay')
+    def test_post_logs_change_after_commit(self, delay_mock):
+        delay_mock.side_effect = lambda *args: log_preference_change(*args)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post()
+        log = PreferenceChangeLog.objects.get(user=self.user)
+        self.assertEqual(log.action, PreferenceChangeLog.ACTION_CREATED)
+        self.assertEqual(log.changes['work_mode'], {'old': None, 'new': 'REMOTE'})
+
     def test_delete_deactivates_preference(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-        }
-        self.client.post(self.url, data=payload, format='json')
-        response = self.client.delete(self.url)
+        self._post()
+        response = self.auth_client.delete(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(JobPreference.objects.filter(user=self.user, is_active=True).count(), 0)
 
     def test_delete_no_preference_returns_404(self):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.delete(self.url)
+        response = self.auth_client.delete(self.url)
         self.assertEqual(response.status_code, 404)
 
-    def test_missing_required_field_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {'work_mode': 'REMOTE'}
-        response = self.client.post(self.url, data=payload, format='json')
-        self.assertEqual(response.status_code, 400)
-
     def test_save_preference_false_does_not_persist(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'save_preference': False,
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(save_preference=False)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(JobPreference.objects.filter(user=self.user, is_active=True).count(), 0)
 
     def test_experience_level_filter(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'experience_level': 'Entry level',
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(experience_level='Entry level')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['preference']['experience_level'], 'Entry level')
 
     def test_invalid_experience_level_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'experience_level': 'INVALID',
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(experience_level='INVALID')
         self.assertEqual(response.status_code, 400)
         self.assertIn('experience_level', response.data)
 
-    def test_preferred_sectors(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'preferred_sectors': ['Technology', 'Finance'],
-        }
-        response = self.client.post(self.url, data=payload, format='json')
-        self.assertEqual(response.status_code, 200)
+    def test_optional_fields_are_accepted(self):
+        cases = [
+            {'preferred_sectors': ['Technology', 'Finance']},
+            {'preferred_roles': ['backend developer', 'python developer']},
+            {'excluded_companies': ['BadCo'], 'preferred_companies': ['Google']},
+            {'weights': {'location': 0.9, 'skill_match': 0.8}},
+        ]
+        for extra in cases:
+            with self.subTest(fields=sorted(extra)):
+                response = self._post(**extra)
+                self.assertEqual(response.status_code, 200)
 
     def test_overlapping_sectors_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'preferred_sectors': ['Technology'],
-            'excluded_sectors': ['Technology'],
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(preferred_sectors=['Technology'], excluded_sectors=['Technology'])
         self.assertEqual(response.status_code, 400)
 
-    def test_preferred_roles(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'preferred_roles': ['backend developer', 'python developer'],
-        }
-        response = self.client.post(self.url, data=payload, format='json')
-        self.assertEqual(response.status_code, 200)
-
-    def test_company_blacklist(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'excluded_companies': ['BadCo'],
-            'preferred_companies': ['Google'],
-        }
-        response = self.client.post(self.url, data=payload, format='json')
-        self.assertEqual(response.status_code, 200)
-
     def test_overlapping_companies_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'excluded_companies': ['Google'],
-            'preferred_companies': ['Google'],
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(excluded_companies=['Google'], preferred_companies=['Google'])
         self.assertEqual(response.status_code, 400)
 
-    def test_weights(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'weights': {'location': 0.9, 'skill_match': 0.8},
-        }
-        response = self.client.post(self.url, data=payload, format='json')
-        self.assertEqual(response.status_code, 200)
-
     def test_invalid_weight_key_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'weights': {'invalid_key': 0.5},
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(weights={'invalid_key': 0.5})
         self.assertEqual(response.status_code, 400)
 
     def test_weight_out_of_range_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'work_mode': 'REMOTE',
-            'employment_type': 'FULL_TIME',
-            'location': 'Bangalore',
-            'company_size_preference': 'STARTUP',
-            'weights': {'location': 1.5},
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(weights={'location': 1.5})
         self.assertEqual(response.status_code, 400)
 
 
-@override_settings(CELERY_TASK_ALWAYS_EAGER=True, AGENT_MATCHING_ENABLED=True)
-class MatchingRunApiTests(TestCase):
-    def setUp(self):
-        self.user = get_user_model().objects.create_user(
+@override_settings(AGENT_MATCHING_ENABLED=True)
+class _MatchingRunBase(TestCase):
+    """Shared user, client and fixtures for the matches-runs endpoint tests."""
+
+    url = reverse_lazy('matches-runs')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             username='run-user',
             email='run@example.com',
             password='password123',
         )
-        self.client = APIClient()
-        self.url = reverse('matches-runs')
+        cls._seed_jobs()
 
-    def _seed_jobs(self):
-        Job.objects.create(
-            job_id='run-job-1',
-            title='Data Intern',
-            company_name='Startup One',
-            location='bangalore, india',
-            job_url='https://example.com/run-job-1',
-            work_mode='REMOTE',
-            employment_type='INTERNSHIP',
-            internship_duration_weeks=12,
-            company_size='STARTUP',
-            stipend_min='10000.00',
-            stipend_max='15000.00',
-            stipend_currency='INR',
-        )
-        Job.objects.create(
-            job_id='run-job-2',
-            title='ML Intern',
-            company_name='Startup Two',
-            location='bangalore, india',
-            job_url='https://example.com/run-job-2',
-            work_mode='REMOTE',
-            employment_type='INTERNSHIP',
-            internship_duration_weeks=12,
-            company_size='STARTUP',
-            stipend_min='12000.00',
-            stipend_max='18000.00',
-            stipend_currency='INR',
+    def setUp(self):
+        self.auth_client = APIClient()
+        self.auth_client.force_authenticate(user=self.user)
+
+        # The view dispatches on commit; tests that need the run processed wrap
+        # the POST in captureOnCommitCallbacks(execute=True), and this runs the
+        # task body inline instead of going through Celery's eager path.
+        patcher = patch('job_search.views.run_matching_pipeline.delay')
+        self.delay_mock = patcher.start()
+        self.delay_mock.side_effect = lambda *args, **kwargs: run_matching_pipeline(*args, **kwargs)
+        self.addCleanup(patcher.stop)
+
+        # These tests cover the HTTP contract and MatchingRun state; the real
+        # ranking is exercised by ResumeSkillMatchingTests and the GPT tests.
+        patcher = patch(
+            'job_search.services.matching_orchestrator.run_agent_pipeline',
+            side_effect=_fake_agent_pipeline,
         )
+        self.pipeline_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @classmethod
+    def _seed_jobs(cls):
+        Job.objects.bulk_create([
+            Job(
+                job_id='run-job-1',
+                title='Data Intern',
+                company_name='Startup One',
+                location='bangalore, india',
+                job_url='https://example.com/run-job-1',
+                work_mode='REMOTE',
+                employment_type='INTERNSHIP',
+                internship_duration_weeks=12,
+                company_size='STARTUP',
+                stipend_min='10000.00',
+                stipend_max='15000.00',
+                stipend_currency='INR',
+            ),
+            Job(
+                job_id='run-job-2',
+                title='ML Intern',
+                company_name='Startup Two',
+                location='bangalore, india',
+                job_url='https://example.com/run-job-2',
+                work_mode='REMOTE',
+                employment_type='INTERNSHIP',
+                internship_duration_weeks=12,
+                company_size='STARTUP',
+                stipend_min='12000.00',
+                stipend_max='18000.00',
+                stipend_currency='INR',
+            ),
+        ])
+
+
+class MatchingRunCreateTests(_MatchingRunBase):
+    def test_run_lifecycle(self):
+        with self.subTest('matching location'):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.auth_client.post(self.url, data=_RUN_PAYLOAD_BASE, format='json')
+
+            self.assertEqual(response.status_code, 202)
+            self.assertIn('run_id', response.data)
+            self.assertEqual(len(callbacks), 1)
+            self.delay_mock.assert_called_once_with(response.data['run_id'])
+
+            run = MatchingRun.objects.get(id=response.data['run_id'])
+            self.assertEqual(run.user_id, self.user.id)
+            self.assertEqual(run.status, MatchingRun.STATUS_COMPLETED)
+            self.pipeline_mock.assert_called_once()
+
+        with self.subTest('no matching jobs'):
+            payload = {
+                'preferences': asdict(replace(_BASE_RUN_PREFS, location='Chennai')),
+                'candidate_profile': _BASE_CANDIDATE_PROFILE,
+            }
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.auth_client.post(self.url, data=payload, format='json')
+            self.assertEqual(response.status_code, 202)
+
+            detail_url = reverse('matches-run-detail', kwargs={'run_id': response.data['run_id']})
+            detail_response = self.auth_client.get(detail_url)
+            self.assertEqual(detail_response.status_code, 200)
+            self.assertEqual(detail_response.data['status'], MatchingRun.STATUS_COMPLETED)
+            self.assertEqual(detail_response.data['filtered_jobs_count'], 0)
+            self.assertEqual(detail_response.data['matched_jobs']['count'], 0)
+            self.assertEqual(detail_response.data['matched_jobs']['results'], [])
 
-    def _payload(self):
-        return {
-            'preferences': {
-                'work_mode': 'REMOTE',
-                'employment_type': 'INTERNSHIP',
-                'internship_duration_weeks': 12,
-                'location': 'Bangalore',
-                'company_size_preference': 'STARTUP',
-                'stipend_min': '9000.00',
-                'stipend_max': '20000.00',
-                'stipend_currency': 'INR',
-                'save_preference': True,
-            },
-            'candidate_profile': {
-                'career_stage': 'EARLY',
-                'risk_tolerance': 'LOW',
-            },
-        }
+    def test_create_run_saves_preference_when_enabled(self):
+        response = self.auth_client.post(self.url, data=_RUN_PAYLOAD_BASE, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(JobPreference.objects.filter(user=self.user, is_active=True).count(), 1)
 
-    def test_create_run_returns_202_and_persists(self):
-        self._seed_jobs()
-        self.client.force_authenticate(user=self.user)
-        response = self.client.post(self.url, data=self._payload(), format='json')
+    def test_create_run_updates_saved_preference_in_place(self):
+        self.auth_client.post(self.url, data=_RUN_PAYLOAD_BASE, format='json')
+        payload = {**_RUN_PAYLOAD_BASE, 'preferences': asdict(replace(_BASE_RUN_PREFS, location='Chennai'))}
+        response = self.auth_client.post(self.url, data=payload, format='json')
+        self.assertEqual(response.status_code, 202)
+        preference = JobPreference.objects.get(user=self.user, is_active=True)
+        self.assertEqual(preference.location, 'chennai')
+
+    @patch('job_search.views.group')
+    def test_batch_creates_one_run_per_preference_set(self, group_mock):
+        payload = {
+            'preferences_batch': [
+                asdict(_BASE_RUN_PREFS),
+                asdict(replace(_BASE_RUN_PREFS, location='Chennai')),
+            ],
+            'candidate_profile': _BASE_CANDIDATE_PROFILE,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.auth_client.post(self.url, data=payload, format='json')
 
         self.assertEqual(response.status_code, 202)
-        self.assertIn('run_id', response.data)
+        run_ids = [item['run_id'] for item in response.data['runs']]
+        self.assertEqual(MatchingRun.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(len(list(group_mock.call_args.args[0])), len(run_ids))
+        group_mock.return_value.apply_async.assert_called_once_with()
+        self.assertFalse(JobPreference.objects.filter(user=self.user).exists())
+
+    def test_batch_reports_invalid_items_by_index(self):
+        payload = {'preferences_batch': [asdict(_BASE_RUN_PREFS), {'work_mode': 'MOON'}]}
+        response = self.auth_client.post(self.url, data=payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['preferences_batch']), {1})
+        self.assertFalse(MatchingRun.objects.exists())
 
-        run = MatchingRun.objects.get(id=response.data['run_id'])
-        self.assertEqual(run.user_id, self.user.id)
-        self.assertIn(run.status, [MatchingRun.STATUS_PENDING, MatchingRun.STATUS_COMPLETED])
 
-    def test_list_runs_returns_user_runs_only(self):
-        self._seed_jobs()
-        other = get_user_model().objects.create_user(
+class MatchingRunListTests(_MatchingRunBase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_user = get_user_model().objects.create_user(
             username='other-user',
             email='other@example.com',
             password='password123',
         )
-        MatchingRun.objects.create(
-            user=other,
-            preferences_snapshot={'work_mode': 'REMOTE'},
-            candidate_profile_snapshot={},
-        )
+        MatchingRun.objects.bulk_create([
+            MatchingRun(
+                user=cls.other_user,
+                preferences_snapshot={'work_mode': 'REMOTE'},
+                candidate_profile_snapshot={},
+            ),
+        ])
 
-        self.client.force_authenticate(user=self.user)
-        self.client.post(self.url, data=self._payload(), format='json')
-        response = self.client.get(self.url)
+    def test_list_runs_returns_user_runs_only(self):
+        self.auth_client.post(self.url, data=_RUN_PAYLOAD_BASE, format='json')
+        # paginator count, page of runs
+        with self.assertNumQueries(2):
+            response = self.auth_client.get(self.url)
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['count'], 1)
         self.assertEqual(len(response.data['results']), 1)
 
+
+class MatchingRunDetailTests(_MatchingRunBase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_user = get_user_model().objects.create_user(
+            username='forbidden-user',
+            email='forbidden@example.com',
+            password='password123',
+        )
+        cls.forbidden_run, cls.failed_run = MatchingRun.objects.bulk_create([
+            MatchingRun(
+                user=cls.other_user,
+                preferences_snapshot={'work_mode': 'REMOTE'},
+                candidate_profile_snapshot={},
+            ),
+            MatchingRun(
+                user=cls.user,
+                status=MatchingRun.STATUS_FAILED,
+                preferences_snapshot={'work_mode': 'REMOTE'},
+                candidate_profile_snapshot={},
+                error_code='AGENT_PIPELINE_ERROR',
+                error_message='Mock failure',
+            ),
+        ])
+
     def test_get_run_detail_returns_top_jobs_when_completed(self):
-        self._seed_jobs()
-        self.client.force_authenticate(user=self.user)
-        create_response = self.client.post(self.url, data=self._payload(), format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            create_response = self.auth_client.post(self.url, data=_RUN_PAYLOAD_BASE, format='json')
         run_id = create_response.data['run_id']
 
         detail_url = reverse('matches-run-detail', kwargs={'run_id': run_id})
-        detail_response = self.client.get(detail_url)
+        # run lookup, paginator count, page of results joined to jobs
+        with self.assertNumQueries(3):
+            detail_response = self.auth_client.get(detail_url)
 
         self.assertEqual(detail_response.status_code, 200)
-        self.assertIn(detail_response.data['status'], [MatchingRun.STATUS_COMPLETED, MatchingRun.STATUS_AGENT_RUNNING, MatchingRun.STATUS_FILTERING, MatchingRun.STATUS_PENDING])
-        if detail_response.data['status'] == MatchingRun.STATUS_COMPLETED:
-            self.assertGreater(len(detail_response.data['matched_jobs']['results']), 0)
-
-    def test_user_cannot_access_another_users_run(self):
-        other = get_user_model().objects.create_user(
-            username='forbidden-user',
-            email='forbidden@example.com',
-            password='password123',
-        )
-        run = MatchingRun.objects.create(
-            user=other,
-            preferences_snapshot={'work_mode': 'REMOTE'},
-            candidate_profile_snapshot={},
-        )
-        self.client.force_authenticate(user=self.user)
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': run.id})
-        response = self.client.get(detail_url)
-        self.assertEqual(response.status_code, 404)
+        self.assertEqual(detail_response.data['status'], MatchingRun.STATUS_COMPLETED)
+        self.assertGreater(len(detail_response.data['matched_jobs']['results']), 0)
 
-    def test_unauthenticated_create_run_returns_401(self):
-        response = self.client.post(self.url, data=self._payload(), format='json')
-        self.assertEqual(response.status_code, 401)
+    def test_skill_gaps_load_jobs_with_results(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_response = self.auth_client.post(self.url, data=_RUN_PAYLOAD_BASE, format='json')
+        run_id = create_response.data['run_id']
 
-    def test_unauthenticated_list_run_returns_401(self):
-        response = self.client.get(self.url)
-        self.assertEqual(response.status_code, 401)
+        result_count = MatchingRun.objects.get(id=run_id).results.count()
+        # Several rows, so a per-row lookup behind the iterator would show up below.
+        self.assertGreater(result_count, 1)
 
-    def test_create_run_saves_preference_when_enabled(self):
-        self._seed_jobs()
-        self.client.force_authenticate(user=self.user)
-        response = self.client.post(self.url, data=self._payload(), format='json')
-        self.assertEqual(response.status_code, 202)
-        self.assertEqual(JobPreference.objects.filter(user=self.user, is_active=True).count(), 1)
+        skill_gaps_url = reverse('skill-gaps', kwargs={'run_id': run_id})
+        # run lookup, then one streamed query of results joined to jobs
+        with self.assertNumQueries(2):
+            response = self.auth_client.get(skill_gaps_url)
 
-    def test_create_run_with_no_matching_jobs_completes_with_empty_results(self):
-        self._seed_jobs()
-        self.client.force_authenticate(user=self.user)
-        payload = self._payload()
-        payload['preferences']['location'] = 'Chennai'
-        response = self.client.post(self.url, data=payload, format='json')
-        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['jobs_analyzed'], result_count)
 
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': response.data['run_id']})
-        detail_response = self.client.get(detail_url)
-        self.assertEqual(detail_response.status_code, 200)
-        self.assertEqual(detail_response.data['status'], MatchingRun.STATUS_COMPLETED)
-        self.assertEqual(detail_response.data['filtered_jobs_count'], 0)
-        self.assertEqual(detail_response.data['matched_jobs']['count'], 0)
-        self.assertEqual(detail_response.data['matched_jobs']['results'], [])
+    def test_user_cannot_access_another_users_run(self):
+        detail_url = reverse('matches-run-detail', kwargs={'run_id': self.forbidden_run.id})
+        response = self.auth_client.get(detail_url)
+        self.assertEqual(response.status_code, 404)
 
     def test_failed_run_detail_includes_error_block(self):
-        run = MatchingRun.objects.create(
-            user=self.user,
-            status=MatchingRun.STATUS_FAILED,
-            preferences_snapshot={'work_mode': 'REMOTE'},
-            candidate_profile_snapshot={},
-            error_code='AGENT_PIPELINE_ERROR',
-            error_message='Mock failure',
-        )
-        self.client.force_authenticate(user=self.user)
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': run.id})
-        response = self.client.get(detail_url)
+        detail_url = reverse('matches-run-detail', kwargs={'run_id': self.failed_run.id})
+        response = self.auth_client.get(detail_url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['status'], MatchingRun.STATUS_FAILED)
         self.assertEqual(response.data['error']['code'], 'AGENT_PIPELINE_ERROR')
         self.assertEqual(response.data['error']['message'], 'Mock failure')
 
 
-@override_settings(AGENT_MATCHING_ENABLED=False)
-class MatchingRunFeatureFlagTests(TestCase):
+class UnauthenticatedEndpointTests(SimpleTestCase):
+    """Anonymous requests are rejected before any database access."""
+
+    preferences_url = reverse_lazy('preferences')
+    runs_url = reverse_lazy('matches-runs')
+
     def setUp(self):
-        self.user = get_user_model().objects.create_user(
-            username='flag-user',
-            email='flag@example.com',
-            password='password123',
-        )
         self.client = APIClient()
-        self.url = reverse('matches-runs')
+
+    def test_unauthenticated_preferences_returns_401(self):
+        response = self.client.get(self.preferences_url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_unauthenticated_create_run_returns_401(self):
+        response = self.client.post(self.runs_url, data=_RUN_PAYLOAD_BASE, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_unauthenticated_list_run_returns_401(self):
+        response = self.client.get(self.runs_url)
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(AGENT_MATCHING_ENABLED=True)
+class ValidationEndpointTests(SimpleTestCase):
+    """Requests that fail validation or a feature flag before any database access."""
+
+    preferences_url = reverse_lazy('preferences')
+    runs_url = reverse_lazy('matches-runs')
+
+    def setUp(self):
+        # An unsaved user is enough: these requests never reach the ORM.
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='validation-user'))
+
+    def test_missing_required_field_returns_400(self):
+        response = self.client.post(self.preferences_url, data={'work_mode': 'REMOTE'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_work_mode_returns_400(self):
+        payload = {**_MATCH_PAYLOAD_BASE['preferences'], 'work_mode': 'ANYWHERE'}
+        response = self.client.post(self.preferences_url, data=payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('work_mode', response.data)
 
     def test_create_run_returns_503_when_feature_disabled(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'preferences': {
-                'work_mode': 'REMOTE',
-                'employment_type': 'FULL_TIME',
-                'location': 'Bangalore',
-                'company_size_preference': 'STARTUP',
-            }
-        }
-        response = self.client.post(self.url, data=payload, format='json')
+        with self.settings(AGENT_MATCHING_ENABLED=False):
+            response = self.client.post(self.runs_url, data=_MATCH_PAYLOAD_BASE, format='json')
         self.assertEqual(response.status_code, 503)
 
 
 class ResumeSkillMatchingTests(TestCase):
     """Tests for resume-to-job skill matching in the orchestrator pipeline."""
 
-    def setUp(self):
-        Job.objects.create(
-            job_id='skill-job-1',
-            title='Python Backend Developer',
-            company_name='TechCorp',
-            location='bangalore, india',
-            job_url='https://example.com/skill-1',
-            work_mode='REMOTE',
-            employment_type='FULL_TIME',
-            company_size='STARTUP',
-            description='Looking for a Python developer with Django and REST API experience.',
-        )
-        Job.objects.create(
-            job_id='skill-job-2',
-            title='Marketing Manager',
-            company_name='AdCorp',
-            location='mumbai, india',
-            job_url='https://example.com/skill-2',
-            work_mode='ONSITE',
-            employment_type='FULL_TIME',
-            company_size='MNC',
-            description='Need SEO expert with Google Analytics and content marketing skills.',
+    PREFERENCES = {
+        'work_mode': 'REMOTE',
+        'employment_type': 'FULL_TIME',
+        'location': 'bangalore',
+        'company_size_preference': 'STARTUP',
+    }
+    RESUME_METADATA = {
+        'skills': [{'category': 'Backend', 'skills': ['Python', 'Django']}],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        Job.objects.bulk_create([
+            Job(
+                job_id='skill-job-1',
+                title='Python Backend Developer',
+                company_name='TechCorp',
+                location='bangalore, india',
+                job_url='https://example.com/skill-1',
+                work_mode='REMOTE',
+                employment_type='FULL_TIME',
+                company_size='STARTUP',
+                description='Looking for a Python developer with Django and REST API experience.',
+            ),
+            Job(
+                job_id='skill-job-2',
+                title='Marketing Manager',
+                company_name='AdCorp',
+                location='mumbai, india',
+                job_url='https://example.com/skill-2',
+                work_mode='ONSITE',
+                employment_type='FULL_TIME',
+                company_size='MNC',
+                description='Need SEO expert with Google Analytics and content marketing skills.',
+            ),
+        ])
+        cls.all_jobs = list(Job.objects.all())
+
+        # The resume assertions only read the ranking, so run the pipeline once per class.
+        cls.result_with_resume = run_agent_pipeline(
+            cls.all_jobs,
+            cls.PREFERENCES,
+            candidate_profile={'resume_metadata': cls.RESUME_METADATA},
         )
 
     def test_skill_matching_activates_with_resume(self):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
-        result = run_agent_pipeline(
-            Job.objects.all(),
-            {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
-            candidate_profile={
-                'resume_metadata': {
-                    'skills': [{'category': 'Backend', 'skills': ['Python', 'Django', 'REST APIs']}],
-                },
-            },
-        )
+        result = self.result_with_resume
         self.assertTrue(result['context']['skill_matching_active'])
         self.assertGreater(result['context']['user_skills_count'], 0)
 
     def test_no_resume_keeps_skill_matching_inactive(self):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
         result = run_agent_pipeline(
-            Job.objects.all(),
-            {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
+            self.all_jobs,
+            self.PREFERENCES,
             candidate_profile={},
         )
         self.assertFalse(result['context']['skill_matching_active'])
         self.assertEqual(result['context']['user_skills_count'], 0)
 
     def test_none_candidate_profile_backward_compatible(self):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
         result = run_agent_pipeline(
-            Job.objects.all(),
-            {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
+            self.all_jobs,
+            self.PREFERENCES,
         )
         self.assertFalse(result['context']['skill_matching_active'])
         self.assertGreater(result['total_ranked'], 0)
 
     def test_skill_match_appears_in_why(self):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
-        result = run_agent_pipeline(
-            Job.objects.all(),
-            {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
-            candidate_profile={
-                'resume_metadata': {
-                    'skills': [{'category': 'Backend', 'skills': ['Python', 'Django']}],
-                },
-            },
-        )
+        result = self.result_with_resume
         skill_match_found = any('Skill match' in tj['why'] for tj in result['top_jobs'])
         self.assertTrue(skill_match_found)
 
     def test_relevant_job_ranked_higher_with_resume(self):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
-        result = run_agent_pipeline(
-            Job.objects.all(),
-            {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
-            candidate_profile={
-                'resume_metadata': {
-                    'skills': [{'category': 'Backend', 'skills': ['Python', 'Django']}],
-                },
-            },
-        )
+        result = self.result_with_resume
         top_job = result['top_jobs'][0]
         job = Job.objects.get(id=top_job['job_id'])
         self.assertIn('Python', job.title)
 
 
+@override_settings(FILTER_JOBS_CACHE_SECONDS=30)
+class FilterJobsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_repeat_preferences_reuse_cached_filter(self):
+        normalized = normalize_preferences(asdict(_BASE_RUN_PREFS))
+        first = filter_jobs(normalized)
+        # The cached ids rebuild a lazy queryset, so nothing is counted again.
+        with self.assertNumQueries(0):
+            second = filter_jobs(normalized)
+        self.assertEqual(second['job_ids'], first['job_ids'])
+        self.assertEqual(second['deterministic_metrics'], first['deterministic_metrics'])
+
+    def test_job_inserted_after_cached_call_is_picked_up(self):
+        normalized = normalize_preferences(asdict(_BASE_RUN_PREFS))
+        self.assertEqual(filter_jobs(normalized)['job_ids'], [])
+
+        job = Job.objects.create(
+            job_id='cache-job-1',
+            title='Data Intern',
+            company_name='Startup One',
+            location='bangalore, india',
+            job_url='https://example.com/cache-job-1',
+            work_mode='REMOTE',
+            employment_type='INTERNSHIP',
+            internship_duration_weeks=12,
+            company_size='STARTUP',
+            stipend_min='10000.00',
+            stipend_max='15000.00',
+            stipend_currency='INR',
+        )
+        bump_jobs_version()
+
+        self.assertEqual(filter_jobs(normalized)['job_ids'], [job.id])
+
+
 @override_settings(GPT_JOB_SCORING_ENABLED=False)
 class GPTScoringDisabledTests(TestCase):
     """Tests verifying GPT scoring is properly disabled by default."""
 
     def test_gpt_disabled_by_default(self):
-        from job_search.services.openai_client import is_gpt_scoring_enabled
         self.assertFalse(is_gpt_scoring_enabled())
 
     def test_pipeline_returns_gpt_not_applied(self):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
         Job.objects.create(
             job_id='gpt-off-job',
             title='Test Job',
@@ -615,7 +711,32 @@ class GPTScoringDisabledTests(TestCase):
 class GPTScoringEnabledTests(TestCase):
     """Tests for GPT scoring when enabled (with mocked OpenAI client)."""
 
-    def setUp(self):
+    _BLEND_RESPONSE_JSON = json.dumps({
+        'role_fit': 0.9,
+        'skill_alignment': 0.85,
+        'career_trajectory': 0.8,
+        'culture_signals': 0.75,
+        'overall_score': 0.85,
+        'reasoning': 'Strong Python/Django match with relevant backend experience.',
+    }, separators=(',', ':'))
+    _MODERATE_RESPONSE_JSON = json.dumps({
+        'role_fit': 0.7,
+        'skill_alignment': 0.6,
+        'career_trajectory': 0.5,
+        'culture_signals': 0.4,
+        'overall_score': 0.6,
+        'reasoning': 'Moderate fit due to partial skill overlap.',
+    }, separators=(',', ':'))
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        patcher = patch('job_search.services.agents.gpt_scorer.get_sync_openai_client')
+        cls.mock_client_fn = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    @classmethod
+    def setUpTestData(cls):
         Job.objects.create(
             job_id='gpt-job-1',
             title='Python Developer',
@@ -627,31 +748,29 @@ class GPTScoringEnabledTests(TestCase):
             company_size='STARTUP',
             description='Python and Django developer needed.',
         )
+        cls.all_jobs = list(Job.objects.all())
 
-    def test_gpt_enabled_flag(self):
-        from job_search.services.openai_client import is_gpt_scoring_enabled
-        self.assertTrue(is_gpt_scoring_enabled())
-
-    @patch('job_search.services.agents.gpt_scorer.get_sync_openai_client')
-    def test_gpt_scoring_blends_with_heuristic(self, mock_client_fn):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
+    def setUp(self):
+        self.mock_client_fn.reset_mock(return_value=True, side_effect=True)
 
+    @classmethod
+    def _make_mock_response(cls, content):
         mock_response = MagicMock()
         mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps({
-            'role_fit': 0.9,
-            'skill_alignment': 0.85,
-            'career_trajectory': 0.8,
-            'culture_signals': 0.75,
-            'overall_score': 0.85,
-            'reasoning': 'Strong Python/Django match with relevant backend experience.',
-        })
+        mock_response.choices[0].message.content = content
+        return mock_response
+
+    def test_gpt_enabled_flag(self):
+        self.assertTrue(is_gpt_scoring_enabled())
+
+    def test_gpt_scoring_blends_with_heuristic(self):
+        mock_response = self._make_mock_response(self._BLEND_RESPONSE_JSON)
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = mock_response
-        mock_client_fn.return_value = mock_client
+        self.mock_client_fn.return_value = mock_client
 
         result = run_agent_pipeline(
-            Job.objects.all(),
+            self.all_jobs,
             {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
             candidate_profile={'resume_metadata': {'skills': [{'category': 'Backend', 'skills': ['Python']}]}},
         )
@@ -660,16 +779,13 @@ class GPTScoringEnabledTests(TestCase):
         top = result['top_jobs'][0]
         self.assertEqual(top['agent_trace']['scoring_method'], 'heuristic+gpt')
 
-    @patch('job_search.services.agents.gpt_scorer.get_sync_openai_client')
-    def test_gpt_failure_falls_back_gracefully(self, mock_client_fn):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
+    def test_gpt_failure_falls_back_gracefully(self):
         mock_client = MagicMock()
         mock_client.chat.completions.create.side_effect = Exception('API Error')
-        mock_client_fn.return_value = mock_client
+        self.mock_client_fn.return_value = mock_client
 
         result = run_agent_pipeline(
-            Job.objects.all(),
+            self.all_jobs,
             {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
         )
         gpt = result['gpt_metrics']
@@ -678,46 +794,36 @@ class GPTScoringEnabledTests(TestCase):
         top = result['top_jobs'][0]
         self.assertEqual(top['agent_trace']['scoring_method'], 'heuristic')
 
-    @patch('job_search.services.agents.gpt_scorer.get_sync_openai_client')
-    def test_gpt_reasoning_replaces_why(self, mock_client_fn):
-        from job_search.services.agents.orchestrator import run_agent_pipeline
-
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps({
-            'role_fit': 0.7,
-            'skill_alignment': 0.6,
-            'career_trajectory': 0.5,
-            'culture_signals': 0.4,
-            'overall_score': 0.6,
-            'reasoning': 'Moderate fit due to partial skill overlap.',
-        })
+    def test_gpt_reasoning_replaces_why(self):
+        mock_response = self._make_mock_response(self._MODERATE_RESPONSE_JSON)
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = mock_response
-        mock_client_fn.return_value = mock_client
+        self.mock_client_fn.return_value = mock_client
 
         result = run_agent_pipeline(
-            Job.objects.all(),
+            self.all_jobs,
             {'work_mode': 'REMOTE', 'employment_type': 'FULL_TIME', 'location': 'bangalore', 'company_size_preference': 'STARTUP'},
         )
         top = result['top_jobs'][0]
         self.assertIn('Moderate fit', top['why'])
 
 
-@override_settings(CELERY_TASK_ALWAYS_EAGER=True, AGENT_MATCHING_ENABLED=True)
+@override_settings(AGENT_MATCHING_ENABLED=True)
 class MatchedJobsPaginationTests(TestCase):
     """Tests for returning all matched jobs with pagination and enriched details."""
 
-    def setUp(self):
-        self.user = get_user_model().objects.create_user(
+    url = reverse_lazy('matches-runs')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             username='paginate-user',
             email='paginate@example.com',
             password='password123',
         )
-        self.client = APIClient()
         # Create 8 jobs to verify we get more than 5
-        for i in range(1, 9):
-            Job.objects.create(
+        Job.objects.bulk_create([
+            Job(
                 job_id=f'paginate-job-{i}',
                 title=f'Developer Role {i}',
                 company_name=f'Company {i}',
@@ -729,66 +835,113 @@ class MatchedJobsPaginationTests(TestCase):
                 company_size='STARTUP',
                 description=f'Description for role {i} with Python and Django.',
             )
+            for i in range(1, 9)
+        ])
+
+    def setUp(self):
+        self.auth_client = APIClient()
+        self.auth_client.force_authenticate(user=self.user)
+
+        # Call the task body directly rather than through Celery's eager mode.
+        patcher = patch(
+            'job_search.views.run_matching_pipeline.delay',
+            side_effect=lambda *args, **kwargs: run_matching_pipeline(*args, **kwargs),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def _create_run(self):
-        self.client.force_authenticate(user=self.user)
-        payload = {
-            'preferences': {
-                'work_mode': 'REMOTE',
-                'employment_type': 'FULL_TIME',
-                'location': 'bangalore',
-                'company_size_preference': 'STARTUP',
-            },
-        }
-        response = self.client.post(reverse('matches-runs'), data=payload, format='json')
-        return response.data['run_id']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.auth_client.post(self.url, data=_MATCH_PAYLOAD_BASE, format='json')
+        run_id = response.data['run_id']
+        return run_id, reverse('matches-run-detail', kwargs={'run_id': run_id})
 
     def test_returns_all_matched_jobs_not_just_5(self):
-        run_id = self._create_run()
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': run_id})
-        response = self.client.get(detail_url)
+        _, detail_url = self._create_run()
+        response = self.auth_client.get(detail_url)
         self.assertEqual(response.status_code, 200)
-        if response.data['status'] == MatchingRun.STATUS_COMPLETED:
-            self.assertGreater(response.data['matched_jobs']['count'], 5)
+        self.assertEqual(response.data['status'], MatchingRun.STATUS_COMPLETED)
+        self.assertGreater(response.data['matched_jobs']['count'], 5)
 
     def test_matched_jobs_has_pagination_structure(self):
-        run_id = self._create_run()
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': run_id})
-        response = self.client.get(detail_url)
+        _, detail_url = self._create_run()
+        response = self.auth_client.get(detail_url)
         self.assertEqual(response.status_code, 200)
-        if response.data['status'] == MatchingRun.STATUS_COMPLETED:
-            matched = response.data['matched_jobs']
-            self.assertIn('count', matched)
-            self.assertIn('next', matched)
-            self.assertIn('previous', matched)
-            self.assertIn('results', matched)
+        self.assertEqual(response.data['status'], MatchingRun.STATUS_COMPLETED)
+        matched = response.data['matched_jobs']
+        self.assertEqual({'count', 'next', 'previous', 'results'} - matched.keys(), set())
+        self.assertLessEqual(len(matched['results']), MatchedJobsPagination.page_size)
+
+    def test_page_size_query_param_is_clamped(self):
+        _, detail_url = self._create_run()
+
+        response = self.auth_client.get(detail_url, {'page_size': 3})
+        matched = response.data['matched_jobs']
+        self.assertEqual(len(matched['results']), 3)
+        self.assertIsNotNone(matched['next'])
+
+        # The run only has 8 results, so lower the cap to see it applied.
+        with patch.object(MatchedJobsPagination, 'max_page_size', 5):
+            response = self.auth_client.get(detail_url, {'page_size': 9999})
+        self.assertEqual(response.status_code, 200)
+        matched = response.data['matched_jobs']
+        self.assertGreater(matched['count'], 5)
+        self.assertEqual(len(matched['results']), 5)
 
     def test_job_details_included_in_results(self):
-        run_id = self._create_run()
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': run_id})
-        response = self.client.get(detail_url)
+        _, detail_url = self._create_run()
+        # Job columns come from the page query's join, not one lookup per result.
+        with self.assertNumQueries(3):
+            response = self.auth_client.get(detail_url)
         self.assertEqual(response.status_code, 200)
-        if response.data['status'] == MatchingRun.STATUS_COMPLETED:
-            results = response.data['matched_jobs']['results']
-            self.assertGreater(len(results), 0)
-            first = results[0]
-            self.assertIn('title', first)
-            self.assertIn('company_name', first)
-            self.assertIn('location', first)
-            self.assertIn('work_mode', first)
-            self.assertIn('apply_url', first)
-            self.assertIn('selection_probability', first)
-            self.assertIn('why', first)
+        self.assertEqual(response.data['status'], MatchingRun.STATUS_COMPLETED)
+        results = response.data['matched_jobs']['results']
+        self.assertGreater(len(results), 0)
+        expected_keys = {
+            'title', 'company_name', 'location', 'work_mode',
+            'apply_url', 'selection_probability', 'why',
+        }
+        self.assertEqual(expected_keys - results[0].keys(), set())
 
     def test_min_score_filter(self):
-        run_id = self._create_run()
-        detail_url = reverse('matches-run-detail', kwargs={'run_id': run_id})
+        _, detail_url = self._create_run()
         # Get all results first
-        all_response = self.client.get(detail_url)
-        if all_response.data['status'] != MatchingRun.STATUS_COMPLETED:
-            return
+        all_response = self.auth_client.get(detail_url)
+        self.assertEqual(all_response.data['status'], MatchingRun.STATUS_COMPLETED)
         total_all = all_response.data['matched_jobs']['count']
         # Filter with a high min_score
-        filtered_response = self.client.get(detail_url, {'min_score': '0.99'})
+        filtered_response = self.auth_client.get(detail_url, {'min_score': '0.99'})
         total_filtered = filtered_response.data['matched_jobs']['count']
         self.assertLessEqual(total_filtered, total_all)
+
+
+class AlertsMarkReadTests(TestCase):
+    url = reverse_lazy('alerts-mark-read')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='alert-user',
+            email='alert@example.com',
+            password='password123',
+        )
+        job = Job.objects.create(
+            job_id='alert-job-1',
+            title='Data Intern',
+            company_name='Startup One',
+            location='bangalore, india',
+            job_url='https://example.com/alert-job-1',
+        )
+        cls.alert = JobAlert.objects.create(user=cls.user, job=job, match_score='0.6000')
+
+    def setUp(self):
+        self.auth_client = APIClient()
+        self.auth_client.force_authenticate(user=self.user)
+
+    def test_too_many_alert_ids_returns_400(self):
+        alert_ids = [self.alert.id] + list(range(10**6, 10**6 + MAX_MARK_READ_ALERT_IDS))
+        response = self.auth_client.post(self.url, data={'alert_ids': alert_ids}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('alert_ids', response.data)
+        self.alert.refresh_from_db()
+        self.assertFalse(self.alert.is_read)
@@ -1,8 +1,8 @@
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from django.urls import reverse
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse, reverse_lazy
 from rest_framework.test import APIClient
 
 from job_search.models import (
@@ -13,43 +13,54 @@ from job_search.models import (
     RecruiterJobPreference,
 )
 
+_CREATE_URL = reverse_lazy('candidate-ranking-run-create')
+
+
+class CandidateRankingUnauthenticatedTests(SimpleTestCase):
+    """Anonymous requests are rejected before any database access."""
 
-class CandidateRankingApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+
+    def test_create_requires_auth(self):
+        response = self.client.post(_CREATE_URL, data={'job_id': 1}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class CandidateRankingApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             username='rank-user',
             email='rank@example.com',
             password='password123',
         )
-        self.job = CompanyTaskJob.objects.create(job_description='Backend role')
+        cls.job = CompanyTaskJob.objects.create(job_description='Backend role')
         RecruiterJobPreference.objects.create(
-            job=self.job,
+            job=cls.job,
             college_tiers=['TIER_1', 'TIER_2'],
             min_experience_years='0.0',
             max_experience_years='2.0',
             coding_platform_criteria=[],
             number_of_openings=2,
         )
-        JobCandidate.objects.create(
-            job=self.job,
-            name='Alice',
-            email='alice@example.com',
-            resume_data='{}',
+        cls.candidates = JobCandidate.objects.bulk_create(
+            [
+                JobCandidate(job=cls.job, name='Alice', email='alice@example.com', resume_data='{}'),
+                JobCandidate(job=cls.job, name='Bob', email='bob@example.com', resume_data='{}'),
+            ]
         )
 
-        self.create_url = reverse('candidate-ranking-run-create')
-        self.list_url = reverse('candidate-ranking-run-list', kwargs={'job_id': self.job.id})
+        cls.list_url = reverse('candidate-ranking-run-list', kwargs={'job_id': cls.job.id})
 
-    def test_create_requires_auth(self):
-        response = self.client.post(self.create_url, data={'job_id': self.job.id}, format='json')
-        self.assertEqual(response.status_code, 401)
+    def setUp(self):
+        self.auth_client = APIClient()
+        self.auth_client.force_authenticate(user=self.user)
 
     @patch('job_search.views.run_candidate_ranking_pipeline.delay')
     def test_create_returns_202(self, delay_mock):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.post(
-            self.create_url,
+        response = self.auth_client.post(
+            _CREATE_URL,
             data={'job_id': self.job.id, 'batch_size': 10, 'force_recompute': True},
             format='json',
         )
@@ -59,7 +70,6 @@ class CandidateRankingApiTests(TestCase):
 
     @patch('job_search.views.run_candidate_ranking_pipeline.delay')
     def test_create_reuses_existing_completed_run(self, delay_mock):
-        self.client.force_authenticate(user=self.user)
         existing = CandidateRankingRun.objects.create(
             job=self.job,
             status=CandidateRankingRun.STATUS_COMPLETED,
@@ -67,51 +77,63 @@ class CandidateRankingApiTests(TestCase):
             processed_candidates=1,
             shortlisted_count=1,
         )
-        response = self.client.post(
-            self.create_url,
+        response = self.auth_client.post(
+            _CREATE_URL,
             data={'job_id': self.job.id, 'batch_size': 10, 'force_recompute': False},
             format='json',
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['run_id'], str(existing.id))
+        self.assertEqual(CandidateRankingRun.objects.filter(job=self.job).count(), 1)
         delay_mock.assert_not_called()
 
     def test_list_runs(self):
-        self.client.force_authenticate(user=self.user)
         CandidateRankingRun.objects.create(job=self.job, status=CandidateRankingRun.STATUS_PENDING)
-        response = self.client.get(self.list_url)
+        response = self.auth_client.get(self.list_url)
         self.assertEqual(response.status_code, 200)
         self.assertGreaterEqual(response.data['count'], 1)
 
     def test_run_detail_returns_results(self):
-        self.client.force_authenticate(user=self.user)
         run = CandidateRankingRun.objects.create(job=self.job, status=CandidateRankingRun.STATUS_COMPLETED)
-        candidate = JobCandidate.objects.filter(job=self.job).first()
-        CandidateRankingResult.objects.create(
-            run=run,
-            candidate=candidate,
-            rank=1,
-            is_shortlisted=True,
-            passes_hard_filter=True,
-            final_score='88.10',
-            sub_scores={'education_fit': 90},
-            filter_reasons=[],
-            summary='Strong candidate',
+        CandidateRankingResult.objects.bulk_create(
+            [
+                CandidateRankingResult(
+                    run=run,
+                    candidate=self.candidates[0],
+                    rank=1,
+                    is_shortlisted=True,
+                    passes_hard_filter=True,
+                    final_score='88.10',
+                    sub_scores={'education_fit': 90},
+                    filter_reasons=[],
+                    summary='Strong candidate',
+                ),
+                CandidateRankingResult(
+                    run=run,
+                    candidate=self.candidates[1],
+                    rank=2,
+                    is_shortlisted=False,
+                    passes_hard_filter=True,
+                    final_score='61.40',
+                    sub_scores={'education_fit': 60},
+                    filter_reasons=[],
+                    summary='Partial fit',
+                ),
+            ]
         )
         detail_url = reverse('candidate-ranking-run-detail', kwargs={'run_id': run.id})
-        response = self.client.get(detail_url)
+        # Run lookup plus one joined results query, however many candidates.
+        with self.assertNumQueries(2):
+            response = self.auth_client.get(detail_url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data['results']), 1)
-        self.assertEqual(response.data['results'][0]['rank'], 1)
+        self.assertEqual([item['rank'] for item in response.data['results']], [1, 2])
+        self.assertEqual(response.data['results'][1]['name'], 'Bob')
 
 
 class RecruiterPreferenceValidationTests(TestCase):
-    def setUp(self):
-        self.job = CompanyTaskJob.objects.create(job_description='Validation role')
-
     def test_invalid_operator_rejected_by_model(self):
+        # Only the criteria are under test, so no job is attached or looked up.
         pref = RecruiterJobPreference(
-            job=self.job,
             college_tiers=['TIER_1'],
             min_experience_years='0.0',
             max_experience_years='3.0',
@@ -121,4 +143,4 @@ class RecruiterPreferenceValidationTests(TestCase):
             number_of_openings=1,
         )
         with self.assertRaises(Exception):
-            pref.full_clean()
+            pref.full_clean(exclude=['job'])
@@ -1,139 +1,132 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase
-from django.urls import reverse
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse_lazy
 from rest_framework.test import APIClient
 
 from job_search.models import CompanyTaskJob, RecruiterJobPreference
 
+_UPSERT_URL = reverse_lazy('company-task-job-preference-upsert')
+
 
 class RecruiterJobPreferenceModelTests(TestCase):
-    def setUp(self):
-        self.job = CompanyTaskJob.objects.create(job_description='Test job')
-
-    def _valid_payload(self):
-        return {
-            'job': self.job,
-            'college_tiers': ['TIER_1', 'TIER_2'],
-            'min_experience_years': '0.0',
-            'max_experience_years': '2.0',
-            'coding_platform_criteria': [
-                {'platform': 'codeforces', 'metric': 'rating', 'operator': 'gte', 'value': 1400}
-            ],
-            'number_of_openings': 2,
-        }
+    _BASE_PAYLOAD = {
+        'college_tiers': ['TIER_1', 'TIER_2'],
+        'min_experience_years': '0.0',
+        'max_experience_years': '2.0',
+        'coding_platform_criteria': [
+            {'platform': 'codeforces', 'metric': 'rating', 'operator': 'gte', 'value': 1400}
+        ],
+        'number_of_openings': 2,
+    }
+
+    def _build(self, **overrides):
+        # No job is attached: the negative tests cover field validation only, so
+        # the job FK is excluded from full_clean instead of being looked up.
+        return RecruiterJobPreference(**{**self._BASE_PAYLOAD, **overrides})
 
     def test_valid_preference_saves(self):
-        pref = RecruiterJobPreference(**self._valid_payload())
-        pref.full_clean()
-        pref.save()
-        self.assertEqual(pref.job_id, self.job.id)
+        job = CompanyTaskJob.objects.create(job_description='Test job')
+        pref = RecruiterJobPreference.objects.create(job=job, **self._BASE_PAYLOAD)
+        self.assertEqual(pref.job_id, job.id)
 
     def test_invalid_college_tier_fails(self):
-        payload = self._valid_payload()
-        payload['college_tiers'] = ['TIER_4']
-        pref = RecruiterJobPreference(**payload)
+        pref = self._build(college_tiers=['TIER_4'])
         with self.assertRaises(ValidationError):
-            pref.full_clean()
+            pref.full_clean(exclude=['job'])
 
     def test_empty_tiers_fails(self):
-        payload = self._valid_payload()
-        payload['college_tiers'] = []
-        pref = RecruiterJobPreference(**payload)
+        pref = self._build(college_tiers=[])
         with self.assertRaises(ValidationError):
-            pref.full_clean()
+            pref.full_clean(exclude=['job'])
 
     def test_min_greater_than_max_fails(self):
-        payload = self._valid_payload()
-        payload['min_experience_years'] = '3.0'
-        payload['max_experience_years'] = '2.0'
-        pref = RecruiterJobPreference(**payload)
+        pref = self._build(min_experience_years='3.0', max_experience_years='2.0')
         with self.assertRaises(ValidationError):
-            pref.full_clean()
+            pref.full_clean(exclude=['job'])
 
     def test_openings_zero_fails(self):
-        payload = self._valid_payload()
-        payload['number_of_openings'] = 0
-        pref = RecruiterJobPreference(**payload)
+        pref = self._build(number_of_openings=0)
         with self.assertRaises(ValidationError):
-            pref.full_clean()
+            pref.full_clean(exclude=['job'])
 
     def test_malformed_coding_criteria_fails(self):
-        payload = self._valid_payload()
-        payload['coding_platform_criteria'] = [{'platform': 'codeforces'}]
-        pref = RecruiterJobPreference(**payload)
+        pref = self._build(coding_platform_criteria=[{'platform': 'codeforces'}])
         with self.assertRaises(ValidationError):
-            pref.full_clean()
+            pref.full_clean(exclude=['job'])
 
 
-class RecruiterJobPreferenceApiTests(TestCase):
+class RecruiterJobPreferenceUnauthenticatedTests(SimpleTestCase):
+    """Anonymous requests are rejected before any database access."""
+
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+
+    def test_unauthenticated_returns_401(self):
+        response = self.client.post(_UPSERT_URL, data={'job_id': 1}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class RecruiterJobPreferenceApiTests(TestCase):
+    _BASE_PAYLOAD = {
+        'college_tiers': ['TIER_1', 'TIER_2'],
+        'min_experience_years': 0,
+        'max_experience_years': 2,
+        'number_of_openings': 3,
+        'coding_platform_criteria': [
+            {'platform': 'codeforces', 'metric': 'rating', 'operator': 'gte', 'value': 1400}
+        ],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             username='pref-user',
             email='pref@example.com',
             password='password123',
         )
-        self.job = CompanyTaskJob.objects.create(job_description='Test job')
-        self.url = reverse('company-task-job-preference-upsert')
-
-    def _payload(self):
-        return {
-            'job_id': self.job.id,
-            'college_tiers': ['TIER_1', 'TIER_2'],
-            'min_experience_years': 0,
-            'max_experience_years': 2,
-            'number_of_openings': 3,
-            'coding_platform_criteria': [
-                {'platform': 'codeforces', 'metric': 'rating', 'operator': 'gte', 'value': 1400}
-            ],
-        }
+        cls.job = CompanyTaskJob.objects.create(job_description='Test job')
+        cls.payload_json = json.dumps({'job_id': cls.job.id, **cls._BASE_PAYLOAD})
 
-    def test_unauthenticated_returns_401(self):
-        response = self.client.post(self.url, data=self._payload(), format='json')
-        self.assertEqual(response.status_code, 401)
+    def setUp(self):
+        self.auth_client = APIClient()
+        self.auth_client.force_authenticate(user=self.user)
+
+    def _post(self, **overrides):
+        payload = {'job_id': self.job.id, **self._BASE_PAYLOAD, **overrides}
+        return self.auth_client.post(_UPSERT_URL, data=payload, format='json')
 
     def test_missing_required_fields_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.post(self.url, data={'job_id': self.job.id}, format='json')
+        response = self.auth_client.post(_UPSERT_URL, data={'job_id': self.job.id}, format='json')
         self.assertEqual(response.status_code, 400)
 
     def test_invalid_job_id_type_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = self._payload()
-        payload['job_id'] = 'abc'
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(job_id='abc')
         self.assertEqual(response.status_code, 400)
 
     def test_job_not_found_returns_404(self):
-        self.client.force_authenticate(user=self.user)
-        payload = self._payload()
-        payload['job_id'] = 999999
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(job_id=999999)
         self.assertEqual(response.status_code, 404)
 
     def test_create_preference_returns_201(self):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.post(self.url, data=self._payload(), format='json')
+        response = self.auth_client.post(_UPSERT_URL, data=self.payload_json, content_type='application/json')
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data['number_of_openings'], 3)
 
     def test_repeat_post_updates_and_returns_200(self):
-        self.client.force_authenticate(user=self.user)
-        self.client.post(self.url, data=self._payload(), format='json')
+        self.auth_client.post(_UPSERT_URL, data=self.payload_json, content_type='application/json')
 
-        payload = self._payload()
-        payload['number_of_openings'] = 5
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(number_of_openings=5)
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['number_of_openings'], 5)
 
     def test_invalid_coding_operator_returns_400(self):
-        self.client.force_authenticate(user=self.user)
-        payload = self._payload()
-        payload['coding_platform_criteria'] = [
-            {'platform': 'codeforces', 'metric': 'rating', 'operator': 'gt', 'value': 1400}
-        ]
-        response = self.client.post(self.url, data=payload, format='json')
+        response = self._post(
+            coding_platform_criteria=[
+                {'platform': 'codeforces', 'metric': 'rating', 'operator': 'gt', 'value': 1400}
+            ]
+        )
         self.assertEqual(response.status_code, 400)
@@ -1,6 +1,21 @@
 from django.urls import path
 
-from .views import *
+from .views import (
+    alerts_mark_read_view,
+    alerts_view,
+    candidate_ranking_run_create_view,
+    candidate_ranking_run_detail_view,
+    candidate_ranking_run_list_view,
+    company_task_job_create_view,
+    company_task_job_import_candidates_view,
+    company_task_job_preference_upsert_view,
+    matches_run_detail_view,
+    matches_runs_view,
+    preference_detail_view,
+    preference_history_view,
+    preferences_view,
+    skill_gap_view,
+)
 
 urlpatterns = [
     path('preferences/', preferences_view, name='preferences'),
@@ -1,10 +1,14 @@
 import json
 from decimal import Decimal, InvalidOperation
+from functools import partial
 
+from celery import group
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -30,42 +34,80 @@ from .process_sheet_and_parse_candidates_data import (
     fetch_rows_from_sheet,
     parse_resume_from_drive_link,
 )
+from .renderers import ORJSONRenderer
 from .services.filtering import filter_jobs
-from .services.preferences import normalize_preferences, to_json_safe
+from .services.preferences import normalize_location, normalize_preferences, to_json_safe
 from .services.skill_matching import extract_skills_from_resume, score_and_rank_jobs
-from .tasks import run_candidate_ranking_pipeline, run_matching_pipeline
+from .tasks import log_preference_change, run_candidate_ranking_pipeline, run_matching_pipeline
+
+MAX_MATCHING_RUN_BATCH = 10
+MAX_MARK_READ_ALERT_IDS = 500
 
 VALID_WEIGHT_KEYS = {
     'work_mode', 'location', 'stipend', 'company_size',
     'experience_level', 'sector', 'role_match', 'company_preference', 'skill_match',
 }
+_VALID_WEIGHT_KEYS_TEXT = ', '.join(sorted(VALID_WEIGHT_KEYS))
+
+_VALID_WORK_MODES = frozenset(c[0] for c in WORK_MODE_CHOICES)
+_VALID_EMPLOYMENT_TYPES = frozenset(c[0] for c in EMPLOYMENT_TYPE_CHOICES)
+_VALID_COMPANY_SIZES = frozenset(c[0] for c in COMPANY_SIZE_CHOICES)
+_VALID_EXPERIENCE_LEVELS = frozenset(c[0] for c in Job.EXPERIENCE_LEVEL_CHOICES)
+_WORK_MODE_ERROR = f'Must be one of: {", ".join(c[0] for c in WORK_MODE_CHOICES)}'
+_EMPLOYMENT_TYPE_ERROR = f'Must be one of: {", ".join(c[0] for c in EMPLOYMENT_TYPE_CHOICES)}'
+_COMPANY_SIZE_ERROR = f'Must be one of: {", ".join(c[0] for c in COMPANY_SIZE_CHOICES)}'
+_EXPERIENCE_LEVEL_ERROR = f'Must be one of: {", ".join(c[0] for c in Job.EXPERIENCE_LEVEL_CHOICES)}'
+_VALID_COLLEGE_TIERS = frozenset(item[0] for item in RECRUITER_COLLEGE_TIERS)
+
+
+class MatchedJobsPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class RunListPagination(PageNumberPagination):
+    page_size = 10
+
+
+class ActivityPagination(PageNumberPagination):
+    page_size = 20
+
+
+_BOOL_STRINGS = {
+    'true': True, '1': True, 'yes': True, 'y': True,
+    'false': False, '0': False, 'no': False, 'n': False,
+}
+_UNREAD_ONLY_VALUES = frozenset({'true', '1', 'yes'})
 
 
 def _coerce_bool(value, field, errors, default=True):
+    # JSON payloads usually carry a real boolean already.
+    if value is True or value is False:
+        return value
     if value is None:
         return default
-    if isinstance(value, bool):
-        return value
     if isinstance(value, int):
         return bool(value)
     if isinstance(value, str):
-        normalized = value.strip().lower()
-        if normalized in ('true', '1', 'yes', 'y'):
-            return True
-        if normalized in ('false', '0', 'no', 'n'):
-            return False
+        parsed = _BOOL_STRINGS.get(value.strip().lower())
+        if parsed is not None:
+            return parsed
     errors[field] = 'Must be a boolean.'
     return default
 
 
 def _coerce_int(value, field, errors, min_value=None):
-    if value is None or value == '':
-        return None
-    try:
-        parsed = int(value)
-    except (TypeError, ValueError):
-        errors[field] = 'Must be an integer.'
+    if type(value) is int:
+        parsed = value
+    elif value is None or value == '':
         return None
+    else:
+        try:
+            parsed = int(value)
+        except (TypeError, ValueError):
+            errors[field] = 'Must be an integer.'
+            return None
     if min_value is not None and parsed < min_value:
         errors[field] = f'Must be at least {min_value}.'
         return None
@@ -75,6 +117,14 @@ def _coerce_int(value, field, errors, min_value=None):
 def _coerce_decimal(value, field, errors):
     if value is None or value == '':
         return None
+    # Ints and strings convert exactly without the str() round trip; floats
+    # still go through str() so 0.1 stays 0.1 rather than its binary expansion.
+    if type(value) is int or type(value) is str:
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            errors[field] = 'Must be a number.'
+            return None
     try:
         return Decimal(str(value))
     except (InvalidOperation, TypeError, ValueError):
@@ -87,7 +137,7 @@ def _coerce_str(value, field, errors, max_length=None, required=False):
         if required:
             errors[field] = 'This field is required.'
         return None
-    if not isinstance(value, str):
+    if type(value) is not str:
         value = str(value)
     value = value.strip()
     if required and not value:
@@ -153,6 +203,8 @@ def _validate_coding_platform_criteria(criteria):
             }
         )
     return normalized, None
+
+
 def _coerce_string_list(value, field, errors, max_items=50):
     if value is None:
         return []
@@ -162,15 +214,22 @@ def _coerce_string_list(value, field, errors, max_items=50):
     if len(value) > max_items:
         errors[field] = f'Maximum {max_items} items allowed.'
         return []
-    result = []
-    for item in value:
-        if not isinstance(item, str) or not item.strip():
-            errors[field] = 'All items must be non-empty strings.'
-            return []
-        result.append(item.strip())
+    # One comprehension strips every item; a dropped non-string shows up as a
+    # length mismatch and a blank one as an empty string.
+    result = [item.strip() for item in value if isinstance(item, str)]
+    if len(result) != len(value) or not all(result):
+        errors[field] = 'All items must be non-empty strings.'
+        return []
     return result
 
 
+def _lowercase_overlap(items, others):
+    # Lowercase each side once; dict.fromkeys dedupes while keeping input order,
+    # so the error message lists the overlap deterministically.
+    others_lower = frozenset(map(str.lower, others))
+    return list(dict.fromkeys(item for item in map(str.lower, items) if item in others_lower))
+
+
 def _priorities_to_weights(priorities, field, errors):
     if priorities is None:
         return {}
@@ -179,111 +238,102 @@ def _priorities_to_weights(priorities, field, errors):
         return {}
     if len(priorities) == 0:
         return {}
-    seen = set()
-    for key in priorities:
-        if not isinstance(key, str):
-            errors[field] = 'Each priority must be a string.'
-            return {}
-        if key not in VALID_WEIGHT_KEYS:
-            errors[field] = f'Invalid priority key: {key}. Valid keys: {", ".join(sorted(VALID_WEIGHT_KEYS))}'
-            return {}
-        if key in seen:
-            errors[field] = f'Duplicate priority key: {key}'
-            return {}
-        seen.add(key)
+    if not all(isinstance(key, str) for key in priorities):
+        errors[field] = 'Each priority must be a string.'
+        return {}
+    # Set arithmetic settles the valid case; the loops below only run to name
+    # the offending key for the error message.
+    keys = set(priorities)
+    if not keys <= VALID_WEIGHT_KEYS:
+        key = next(key for key in priorities if key not in VALID_WEIGHT_KEYS)
+        errors[field] = f'Invalid priority key: {key}. Valid keys: {_VALID_WEIGHT_KEYS_TEXT}'
+        return {}
+    if len(keys) != len(priorities):
+        seen = set()
+        for key in priorities:
+            if key in seen:
+                errors[field] = f'Duplicate priority key: {key}'
+                return {}
+            seen.add(key)
     n = len(priorities)
     total = n * (n + 1) / 2
-    weights = {}
-    for i, key in enumerate(priorities):
-        weights[key] = round((n - i) / total, 2)
-    return weights
+    return {key: round((n - i) / total, 2) for i, key in enumerate(priorities)}
 
 
-def _validate_preference_payload(data):
-    errors = {}
-    valid_work_modes = [c[0] for c in WORK_MODE_CHOICES]
-    valid_employment_types = [c[0] for c in EMPLOYMENT_TYPE_CHOICES]
-    valid_company_sizes = [c[0] for c in COMPANY_SIZE_CHOICES]
-    valid_experience_levels = [c[0] for c in Job.EXPERIENCE_LEVEL_CHOICES]
-
-    work_mode = data.get('work_mode')
-    if work_mode is None or work_mode == '':
-        errors['work_mode'] = 'This field is required.'
-    elif work_mode not in valid_work_modes:
-        errors['work_mode'] = f'Must be one of: {", ".join(valid_work_modes)}'
-
-    employment_type = data.get('employment_type')
-    if employment_type is None or employment_type == '':
-        errors['employment_type'] = 'This field is required.'
-    elif employment_type not in valid_employment_types:
-        errors['employment_type'] = f'Must be one of: {", ".join(valid_employment_types)}'
-
-    location = _coerce_str(data.get('location'), 'location', errors, max_length=200, required=True)
-
-    company_size_preference = data.get('company_size_preference')
-    if company_size_preference is None or company_size_preference == '':
-        errors['company_size_preference'] = 'This field is required.'
-    elif company_size_preference not in valid_company_sizes:
-        errors['company_size_preference'] = f'Must be one of: {", ".join(valid_company_sizes)}'
-
-    internship_duration_weeks = _coerce_int(
-        data.get('internship_duration_weeks'),
-        'internship_duration_weeks',
-        errors,
-        min_value=1,
-    )
-
-    stipend_min = _coerce_decimal(data.get('stipend_min'), 'stipend_min', errors)
-    stipend_max = _coerce_decimal(data.get('stipend_max'), 'stipend_max', errors)
+def _coerce_choice(value, field, errors, valid, error, required=True):
+    if value is None or value == '':
+        if required:
+            errors[field] = 'This field is required.'
+        return None
+    if not isinstance(value, str) or value not in valid:
+        errors[field] = error
+        return None
+    return value
 
-    stipend_currency = _coerce_str(
-        data.get('stipend_currency'),
-        'stipend_currency',
-        errors,
-        max_length=3,
-        required=False,
-    ) or 'INR'
 
-    save_preference = _coerce_bool(data.get('save_preference'), 'save_preference', errors, default=True)
+# (validated key, payload key, coercer) for every preference field, bound once
+# at import; _validate_preference_payload just walks the table.
+_PREFERENCE_FIELDS = (
+    ('work_mode', 'work_mode', partial(_coerce_choice, valid=_VALID_WORK_MODES, error=_WORK_MODE_ERROR)),
+    ('employment_type', 'employment_type', partial(
+        _coerce_choice, valid=_VALID_EMPLOYMENT_TYPES, error=_EMPLOYMENT_TYPE_ERROR,
+    )),
+    ('location', 'location', partial(_coerce_str, max_length=200, required=True)),
+    ('company_size_preference', 'company_size_preference', partial(
+        _coerce_choice, valid=_VALID_COMPANY_SIZES, error=_COMPANY_SIZE_ERROR,
+    )),
+    ('internship_duration_weeks', 'internship_duration_weeks', partial(_coerce_int, min_value=1)),
+    ('stipend_min', 'stipend_min', _coerce_decimal),
+    ('stipend_max', 'stipend_max', _coerce_decimal),
+    ('stipend_currency', 'stipend_currency', partial(_coerce_str, max_length=3)),
+    ('save_preference', 'save_preference', _coerce_bool),
+    ('experience_level', 'experience_level', partial(
+        _coerce_choice, valid=_VALID_EXPERIENCE_LEVELS, error=_EXPERIENCE_LEVEL_ERROR, required=False,
+    )),
+    ('preferred_sectors', 'preferred_sectors', _coerce_string_list),
+    ('excluded_sectors', 'excluded_sectors', _coerce_string_list),
+    ('preferred_roles', 'preferred_roles', _coerce_string_list),
+    ('excluded_keywords', 'excluded_keywords', _coerce_string_list),
+    ('excluded_companies', 'excluded_companies', _coerce_string_list),
+    ('preferred_companies', 'preferred_companies', _coerce_string_list),
+    ('weights', 'priorities', _priorities_to_weights),
+    ('name', 'name', partial(_coerce_str, max_length=100)),
+)
 
-    # Experience level (optional)
-    experience_level = data.get('experience_level')
-    if experience_level is not None and experience_level != '':
-        if experience_level not in valid_experience_levels:
-            errors['experience_level'] = f'Must be one of: {", ".join(valid_experience_levels)}'
-    else:
-        experience_level = None
 
-    # List fields
-    preferred_sectors = _coerce_string_list(data.get('preferred_sectors'), 'preferred_sectors', errors)
-    excluded_sectors = _coerce_string_list(data.get('excluded_sectors'), 'excluded_sectors', errors)
-    preferred_roles = _coerce_string_list(data.get('preferred_roles'), 'preferred_roles', errors)
-    excluded_keywords = _coerce_string_list(data.get('excluded_keywords'), 'excluded_keywords', errors)
-    excluded_companies = _coerce_string_list(data.get('excluded_companies'), 'excluded_companies', errors)
-    preferred_companies = _coerce_string_list(data.get('preferred_companies'), 'preferred_companies', errors)
+def _validate_preference_payload(data):
+    errors = {}
+    validated = {
+        key: coerce(data.get(field), field, errors)
+        for key, field, coerce in _PREFERENCE_FIELDS
+    }
+    validated['stipend_currency'] = validated['stipend_currency'] or 'INR'
+    validated['name'] = validated['name'] or 'Default'
 
     # Cross-validation: no overlap between preferred and excluded
+    preferred_sectors = validated['preferred_sectors']
+    excluded_sectors = validated['excluded_sectors']
     if preferred_sectors and excluded_sectors:
-        overlap = set(s.lower() for s in preferred_sectors) & set(s.lower() for s in excluded_sectors)
+        overlap = _lowercase_overlap(preferred_sectors, excluded_sectors)
         if overlap:
             errors['preferred_sectors'] = f'Cannot overlap with excluded_sectors: {", ".join(overlap)}'
 
+    excluded_companies = validated['excluded_companies']
+    preferred_companies = validated['preferred_companies']
     if excluded_companies and preferred_companies:
-        overlap = set(c.lower() for c in excluded_companies) & set(c.lower() for c in preferred_companies)
+        overlap = _lowercase_overlap(preferred_companies, excluded_companies)
         if overlap:
             errors['preferred_companies'] = f'Cannot overlap with excluded_companies: {", ".join(overlap)}'
 
-    # Priorities → Weights
-    weights = _priorities_to_weights(data.get('priorities'), 'priorities', errors)
-
-    # Name (for multi-profile)
-    name = _coerce_str(data.get('name'), 'name', errors, max_length=100) or 'Default'
-
+    employment_type = validated['employment_type']
+    internship_duration_weeks = validated['internship_duration_weeks']
     if employment_type == 'INTERNSHIP' and not internship_duration_weeks:
         errors['internship_duration_weeks'] = 'Required for internship employment type.'
     if employment_type == 'FULL_TIME' and internship_duration_weeks is not None:
         errors['internship_duration_weeks'] = 'Must be empty for full-time employment type.'
 
+    stipend_min = validated['stipend_min']
+    stipend_max = validated['stipend_max']
     if (stipend_min is not None) != (stipend_max is not None):
         errors['stipend'] = 'Both stipend_min and stipend_max are required when stipend is provided.'
     if stipend_min is not None and stipend_max is not None and stipend_min > stipend_max:
@@ -291,27 +341,6 @@ def _validate_preference_payload(data):
 
     if errors:
         return None, errors
-
-    validated = {
-        'work_mode': work_mode,
-        'employment_type': employment_type,
-        'internship_duration_weeks': internship_duration_weeks,
-        'location': location,
-        'company_size_preference': company_size_preference,
-        'stipend_min': stipend_min,
-        'stipend_max': stipend_max,
-        'stipend_currency': stipend_currency,
-        'save_preference': save_preference,
-        'experience_level': experience_level,
-        'preferred_sectors': preferred_sectors,
-        'excluded_sectors': excluded_sectors,
-        'preferred_roles': preferred_roles,
-        'excluded_keywords': excluded_keywords,
-        'excluded_companies': excluded_companies,
-        'preferred_companies': preferred_companies,
-        'weights': weights,
-        'name': name,
-    }
     return validated, None
 
 
@@ -323,6 +352,10 @@ def _preference_defaults(validated):
 
 
 def _preference_from_model(preference):
+    # Emits JSON-safe values directly (stipend Decimals as strings), so responses
+    # and change-log snapshots can use the dict as is.
+    stipend_min = preference.stipend_min
+    stipend_max = preference.stipend_max
     return {
         'id': preference.id,
         'name': preference.name,
@@ -332,8 +365,8 @@ def _preference_from_model(preference):
         'location': preference.location,
         'company_size_preference': preference.company_size_preference,
         'experience_level': preference.experience_level,
-        'stipend_min': preference.stipend_min,
-        'stipend_max': preference.stipend_max,
+        'stipend_min': str(stipend_min) if stipend_min is not None else None,
+        'stipend_max': str(stipend_max) if stipend_max is not None else None,
         'stipend_currency': preference.stipend_currency,
         'preferred_sectors': preference.preferred_sectors,
         'excluded_sectors': preference.excluded_sectors,
@@ -346,69 +379,93 @@ def _preference_from_model(preference):
     }
 
 
-def _log_preference_change(user, preference, action, before=None, after=None):
-    before = before or {}
-    after = after or {}
-    changes = {}
-    all_keys = set(list(before.keys()) + list(after.keys()))
-    for key in all_keys:
-        old_val = before.get(key)
-        new_val = after.get(key)
-        if old_val != new_val:
-            changes[key] = {'old': old_val, 'new': new_val}
-    PreferenceChangeLog.objects.create(
-        user=user,
-        preference=preference,
-        action=action,
-        preference_name=preference.name if preference else '',
-        snapshot_before=to_json_safe(before),
-        snapshot_after=to_json_safe(after),
-        changes=to_json_safe(changes),
-    )
+def _preference_json_safe(preference):
+    """to_json_safe for flat preference dicts, whose only Decimals are the stipend bounds."""
+    safe = dict(preference)
+    for key in ('stipend_min', 'stipend_max'):
+        if safe.get(key) is not None:
+            safe[key] = str(safe[key])
+    return safe
 
 
-def _serialize_matching_result(result):
-    return to_json_safe(
-        {
-            'rank': result.rank,
-            'job_id': result.job.job_id,
-            'title': result.job.title,
-            'company_name': result.job.company_name,
-            'location': result.job.location,
-            'work_mode': result.job.work_mode,
-            'sector': result.job.sector or '',
-            'employment_type': result.job.employment_type,
-            'apply_url': result.job.apply_url or result.job.job_url,
-            'selection_probability': result.selection_probability,
-            'fit_score': result.fit_score,
-            'job_quality_score': result.job_quality_score,
-            'why': result.why,
-        }
+def _log_preference_change(user, preference, action, before=None, after=None):
+    # before/after come from _preference_from_model and are already JSON-safe,
+    # so they can be handed to the task as is; the diff and INSERT run there.
+    args = (
+        user.id,
+        preference.id if preference else None,
+        action,
+        preference.name if preference else '',
+        before or {},
+        after or {},
     )
 
+    def dispatch():
+        try:
+            log_preference_change.delay(*args)
+        except Exception:
+            # Fallback to local execution when broker is unavailable.
+            log_preference_change.run(*args)
+
+    transaction.on_commit(dispatch)
+
+
+# Columns read by _serialize_matching_result; keeps agent_trace and the job
+# description out of the run detail query. 'run' must stay: the related
+# manager sets result.run from run_id, and a deferred run_id costs one query
+# per row.
+MATCHING_RESULT_FIELDS = (
+    'run',
+    'rank',
+    'selection_probability',
+    'fit_score',
+    'job_quality_score',
+    'why',
+    'job',
+    'job__job_id',
+    'job__title',
+    'job__company_name',
+    'job__location',
+    'job__work_mode',
+    'job__sector',
+    'job__employment_type',
+    'job__apply_url',
+    'job__job_url',
+)
+
 
-def _serialize_matching_run_list(run):
+def _serialize_matching_result(result):
+    # The three scores are the only Decimals; everything else is already JSON-native.
+    job = result.job
+    fit_score = result.fit_score
+    job_quality_score = result.job_quality_score
     return {
-        'run_id': str(run.id),
-        'status': run.status,
-        'filtered_jobs_count': run.filtered_jobs_count,
-        'created_at': run.created_at.isoformat() if run.created_at else None,
-        'completed_at': run.completed_at.isoformat() if run.completed_at else None,
+        'rank': result.rank,
+        'job_id': job.job_id,
+        'title': job.title,
+        'company_name': job.company_name,
+        'location': job.location,
+        'work_mode': job.work_mode,
+        'sector': job.sector or '',
+        'employment_type': job.employment_type,
+        'apply_url': job.apply_url or job.job_url,
+        'selection_probability': str(result.selection_probability),
+        'fit_score': str(fit_score) if fit_score is not None else None,
+        'job_quality_score': str(job_quality_score) if job_quality_score is not None else None,
+        'why': result.why,
     }
 
 
-def _serialize_matching_run_detail(run):
+MATCHING_RUN_LIST_FIELDS = ('id', 'status', 'filtered_jobs_count', 'created_at', 'completed_at')
+
+
+def _serialize_matching_run_list(row):
     return {
-        'run_id': str(run.id),
-        'status': run.status,
-        'preferences_snapshot': to_json_safe(run.preferences_snapshot),
-        'filtered_jobs_count': run.filtered_jobs_count,
-        'timing_metrics': to_json_safe(run.timing_metrics),
-        'error_code': run.error_code,
-        'error_message': run.error_message,
-        'started_at': run.started_at.isoformat() if run.started_at else None,
-        'completed_at': run.completed_at.isoformat() if run.completed_at else None,
-        'created_at': run.created_at.isoformat() if run.created_at else None,
+        'run_id': str(row['id']),
+        'status': row['status'],
+        'filtered_jobs_count': row['filtered_jobs_count'],
+        'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+        'completed_at': row['completed_at'].isoformat() if row['completed_at'] else None,
     }
 
 
@@ -452,21 +509,23 @@ def _serialize_candidate_ranking_result(result):
 @permission_classes([IsAuthenticated])
 def preferences_view(request):
     if request.method == 'GET':
-        preferences = JobPreference.objects.filter(user=request.user, is_active=True)
-        if not preferences.exists():
+        # A user holds a handful of active preferences; one query fetches them all.
+        preferences = list(JobPreference.objects.filter(user=request.user, is_active=True))
+        if not preferences:
             return Response({'preference': None}, status=status.HTTP_200_OK)
-        if preferences.count() == 1:
+        if len(preferences) == 1:
             return Response(
-                {'preference': to_json_safe(_preference_from_model(preferences.first()))},
+                {'preference': _preference_from_model(preferences[0])},
                 status=status.HTTP_200_OK,
             )
         return Response(
-            {'preferences': [to_json_safe(_preference_from_model(p)) for p in preferences]},
+            {'preferences': [_preference_from_model(p) for p in preferences]},
             status=status.HTTP_200_OK,
         )
 
     if request.method == 'DELETE':
-        name = request.data.get('name') if request.data else None
+        payload = request.data
+        name = payload.get('name') if payload else None
         qs = JobPreference.objects.filter(user=request.user, is_active=True)
         if name:
             qs = qs.filter(name=name)
@@ -490,11 +549,12 @@ def preferences_view(request):
     if errors:
         return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-    normalized = normalize_preferences(validated)
+    # Only the location is normalised for storage; the rest is saved as validated.
+    location = normalize_location(validated['location'])
 
     if validated.get('save_preference', True):
         defaults = _preference_defaults(validated)
-        defaults['location'] = normalized['location']
+        defaults['location'] = location
         name = validated.get('name', 'Default')
 
         existing = JobPreference.objects.filter(
@@ -517,10 +577,10 @@ def preferences_view(request):
         )
 
     preference_echo = _preference_defaults(validated)
-    preference_echo['location'] = normalized['location']
+    preference_echo['location'] = location
     return Response(
         {
-            'preference': to_json_safe(preference_echo),
+            'preference': _preference_json_safe(preference_echo),
         },
         status=status.HTTP_200_OK,
     )
@@ -538,7 +598,7 @@ def preference_detail_view(request, preference_id):
 
     if request.method == 'GET':
         return Response(
-            {'preference': to_json_safe(_preference_from_model(preference))},
+            {'preference': _preference_from_model(preference)},
             status=status.HTTP_200_OK,
         )
 
@@ -558,11 +618,10 @@ def preference_detail_view(request, preference_id):
     if errors:
         return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-    normalized = normalize_preferences(validated)
     before_snapshot = _preference_from_model(preference)
 
     defaults = _preference_defaults(validated)
-    defaults['location'] = normalized['location']
+    defaults['location'] = normalize_location(validated['location'])
     for key, value in defaults.items():
         setattr(preference, key, value)
     preference.save()
@@ -574,26 +633,135 @@ def preference_detail_view(request, preference_id):
         before=before_snapshot,
         after=after_snapshot,
     )
+    return Response({'preference': after_snapshot}, status=status.HTTP_200_OK)
+
+
+def _upsert_active_preference(user, name, defaults):
+    # The run only needs the preference stored, not loaded, so try the UPDATE
+    # first and fall back to an INSERT. update() skips auto_now, hence updated_at.
+    # bulk_create(update_conflicts=True) cannot target the partial unique
+    # constraint on (user, name) WHERE is_active.
+    active = JobPreference.objects.filter(user=user, name=name, is_active=True)
+    if active.update(**defaults, updated_at=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            JobPreference.objects.create(user=user, name=name, is_active=True, **defaults)
+    except IntegrityError:
+        # A concurrent request created it between the UPDATE and the INSERT.
+        active.update(**defaults, updated_at=timezone.now())
+
+
+def _dispatch_matching_run(run_id):
+    try:
+        run_matching_pipeline.delay(run_id)
+    except Exception:
+        # Fallback to local execution when broker is unavailable.
+        run_matching_pipeline.run(run_id)
+
+
+def _dispatch_matching_runs(run_ids):
+    try:
+        group(run_matching_pipeline.s(run_id) for run_id in run_ids).apply_async()
+    except Exception:
+        # Fallback to local execution when broker is unavailable.
+        for run_id in run_ids:
+            run_matching_pipeline.run(run_id)
+
+
+def _run_preferences_snapshot(normalized_preferences):
+    # _preference_json_safe already copies the dict, so drop the keys from that copy.
+    preferences_snapshot = _preference_json_safe(normalized_preferences)
+    for key in ('save_preference', 'name', 'id'):
+        preferences_snapshot.pop(key, None)
+    return preferences_snapshot
+
+
+def _candidate_profile_snapshot(request, payload):
+    candidate_profile = payload.get('candidate_profile') or {}
+    user_resume_metadata = getattr(request.user, 'resume_metadata', None) or {}
+    if user_resume_metadata:
+        candidate_profile['resume_metadata'] = user_resume_metadata
+    return to_json_safe(candidate_profile)
+
+
+def _create_matching_run_batch(request, payload, preferences_batch):
+    if not isinstance(preferences_batch, list) or not preferences_batch:
+        return Response(
+            {'preferences_batch': 'This field must be a non-empty list.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(preferences_batch) > MAX_MATCHING_RUN_BATCH:
+        return Response(
+            {'preferences_batch': f'At most {MAX_MATCHING_RUN_BATCH} preference sets are allowed.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    snapshots = []
+    batch_errors = {}
+    for index, preferences_data in enumerate(preferences_batch):
+        if not isinstance(preferences_data, dict):
+            batch_errors[index] = 'This item must be an object.'
+            continue
+        preferences, errors = _validate_preference_payload(preferences_data)
+        if errors:
+            batch_errors[index] = errors
+            continue
+        snapshots.append(_run_preferences_snapshot(normalize_preferences(preferences)))
+    if batch_errors:
+        return Response({'preferences_batch': batch_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Batch runs are one-off comparisons, so none of the sets is saved as a preference.
+    candidate_profile_snapshot = _candidate_profile_snapshot(request, payload)
+    runs = MatchingRun.objects.bulk_create(
+        [
+            MatchingRun(
+                user=request.user,
+                status=MatchingRun.STATUS_PENDING,
+                preferences_snapshot=snapshot,
+                candidate_profile_snapshot=candidate_profile_snapshot,
+            )
+            for snapshot in snapshots
+        ]
+    )
+
+    run_ids = [str(run.id) for run in runs]
+    transaction.on_commit(lambda: _dispatch_matching_runs(run_ids))
+
     return Response(
-        {'preference': to_json_safe(_preference_from_model(preference))},
-        status=status.HTTP_200_OK,
+        {
+            'runs': [
+                {
+                    'run_id': str(run.id),
+                    'status': run.status,
+                    'submitted_at': run.created_at.isoformat() if run.created_at else None,
+                }
+                for run in runs
+            ],
+        },
+        status=status.HTTP_202_ACCEPTED,
     )
 
 
 @api_view(['GET', 'POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer])
 def matches_runs_view(request):
     if request.method == 'GET':
-        queryset = MatchingRun.objects.filter(user=request.user).order_by('-created_at')
-        paginator = PageNumberPagination()
-        paginator.page_size = 10
+        # Rows come back as dicts; the list never needs the JSON snapshots.
+        queryset = (
+            MatchingRun.objects.filter(user=request.user)
+            .order_by('-created_at')
+            .values(*MATCHING_RUN_LIST_FIELDS)
+        )
+        paginator = RunListPagination()
         page = paginator.paginate_queryset(queryset, request)
         page_queryset = page if page is not None else queryset
-        data = [_serialize_matching_run_list(run) for run in page_queryset]
+        data = [_serialize_matching_run_list(row) for row in page_queryset]
         return Response(
             {
-                'count': queryset.count(),
+                'count': paginator.page.paginator.count if page is not None else queryset.count(),
                 'next': paginator.get_next_link() if page is not None else None,
                 'previous': paginator.get_previous_link() if page is not None else None,
                 'results': data,
@@ -608,6 +776,10 @@ def matches_runs_view(request):
         )
 
     payload = request.data
+    preferences_batch = payload.get('preferences_batch')
+    if preferences_batch is not None:
+        return _create_matching_run_batch(request, payload, preferences_batch)
+
     preferences_data = payload.get('preferences')
     if preferences_data is None:
         # Try preference_id or preference_name first, then fall back to most recent
@@ -634,7 +806,7 @@ def matches_runs_view(request):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        preferences = _preference_from_model(active_preference)
+        normalized_preferences = normalize_preferences(_preference_from_model(active_preference))
     else:
         if not isinstance(preferences_data, dict):
             return Response(
@@ -652,34 +824,17 @@ def matches_runs_view(request):
             defaults = _preference_defaults(preferences)
             defaults['location'] = normalized_preferences['location']
             name = preferences.get('name', 'Default')
-            JobPreference.objects.update_or_create(
-                user=request.user,
-                name=name,
-                is_active=True,
-                defaults=defaults,
-            )
-    if preferences_data is None:
-        normalized_preferences = normalize_preferences(preferences)
-
-    candidate_profile = payload.get('candidate_profile') or {}
-    user_resume_metadata = getattr(request.user, 'resume_metadata', None) or {}
-    if user_resume_metadata:
-        candidate_profile['resume_metadata'] = user_resume_metadata
+            _upsert_active_preference(request.user, name, defaults)
 
     run = MatchingRun.objects.create(
         user=request.user,
         status=MatchingRun.STATUS_PENDING,
-        preferences_snapshot=to_json_safe(
-            {k: v for k, v in normalized_preferences.items() if k not in ('save_preference', 'name', 'id')}
-        ),
-        candidate_profile_snapshot=to_json_safe(candidate_profile),
+        preferences_snapshot=_run_preferences_snapshot(normalized_preferences),
+        candidate_profile_snapshot=_candidate_profile_snapshot(request, payload),
     )
 
-    try:
-        run_matching_pipeline.delay(str(run.id))
-    except Exception:
-        # Fallback to local execution when broker is unavailable.
-        run_matching_pipeline.run(str(run.id))
+    run_id = str(run.id)
+    transaction.on_commit(lambda: _dispatch_matching_run(run_id))
 
     return Response(
         {
@@ -694,17 +849,18 @@ def matches_runs_view(request):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer])
 def matches_run_detail_view(request, run_id):
-    run = MatchingRun.objects.filter(id=run_id, user=request.user).first()
+    # Every other column is echoed back; the candidate profile carries the
+    # whole resume and is never part of the response.
+    run = MatchingRun.objects.filter(id=run_id, user=request.user).defer('candidate_profile_snapshot').first()
     if not run:
         return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    data = _serialize_matching_run_detail(run)
-
     # Build matched_jobs with pagination
     matched_jobs_data = {}
     if run.status == MatchingRun.STATUS_COMPLETED:
-        results_qs = run.results.select_related('job').all()
+        results_qs = run.results.select_related('job').only(*MATCHING_RESULT_FIELDS)
 
         # Optional min_score filter
         min_score = request.query_params.get('min_score')
@@ -715,14 +871,12 @@ def matches_run_detail_view(request, run_id):
             except (ValueError, TypeError):
                 pass
 
-        total_matched = results_qs.count()
-        paginator = PageNumberPagination()
-        paginator.page_size = 20
+        paginator = MatchedJobsPagination()
         page = paginator.paginate_queryset(results_qs, request)
         page_results = page if page is not None else results_qs
 
         matched_jobs_data = {
-            'count': total_matched,
+            'count': paginator.page.paginator.count if page is not None else results_qs.count(),
             'next': paginator.get_next_link() if page is not None else None,
             'previous': paginator.get_previous_link() if page is not None else None,
             'results': [_serialize_matching_result(r) for r in page_results],
@@ -737,21 +891,22 @@ def matches_run_detail_view(request, run_id):
 
     return Response(
         {
-            'run_id': data['run_id'],
-            'status': data['status'],
-            'filtered_jobs_count': data['filtered_jobs_count'],
-            'preference_used': data['preferences_snapshot'],
-            'timings': data['timing_metrics'],
+            'run_id': str(run.id),
+            'status': run.status,
+            'filtered_jobs_count': run.filtered_jobs_count,
+            # JSONField values decode to JSON-native types already.
+            'preference_used': run.preferences_snapshot,
+            'timings': run.timing_metrics,
             'matched_jobs': matched_jobs_data,
             'error': {
-                'code': data['error_code'],
-                'message': data['error_message'],
+                'code': run.error_code,
+                'message': run.error_message,
             }
             if run.status == MatchingRun.STATUS_FAILED
             else None,
-            'started_at': data['started_at'],
-            'completed_at': data['completed_at'],
-            'created_at': data['created_at'],
+            'started_at': run.started_at.isoformat() if run.started_at else None,
+            'completed_at': run.completed_at.isoformat() if run.completed_at else None,
+            'created_at': run.created_at.isoformat() if run.created_at else None,
         },
         status=status.HTTP_200_OK,
     )
@@ -761,7 +916,7 @@ def matches_run_detail_view(request, run_id):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def skill_gap_view(request, run_id):
-    run = MatchingRun.objects.filter(id=run_id, user=request.user).first()
+    run = MatchingRun.objects.filter(id=run_id, user=request.user).only('id', 'status').first()
     if not run:
         return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -772,7 +927,15 @@ def skill_gap_view(request, run_id):
         )
 
     from .services.skill_gap import analyze_skill_gaps
-    results = run.results.select_related('job').all()
+    # analyze_skill_gaps only reads the job's title, description and work_type,
+    # in a single pass, so stream the rows instead of caching every description.
+    # run stays in the projection so attaching each result to its run does not
+    # query run_id row by row.
+    results = (
+        run.results.select_related('job')
+        .only('run', 'job', 'job__title', 'job__description', 'job__work_type')
+        .iterator(chunk_size=100)
+    )
     resume_metadata = getattr(request.user, 'resume_metadata', None) or {}
     analysis = analyze_skill_gaps(results, resume_metadata)
     return Response(analysis, status=status.HTTP_200_OK)
@@ -782,26 +945,24 @@ def skill_gap_view(request, run_id):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def preference_history_view(request):
-    queryset = PreferenceChangeLog.objects.filter(user=request.user).order_by('-created_at')
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    queryset = (
+        PreferenceChangeLog.objects.filter(user=request.user)
+        .order_by('-created_at')
+        .values('id', 'action', 'preference_name', 'changes', 'snapshot_before', 'snapshot_after', 'created_at')
+    )
+    paginator = ActivityPagination()
     page = paginator.paginate_queryset(queryset, request)
     page_queryset = page if page is not None else queryset
     data = [
         {
-            'id': log.id,
-            'action': log.action,
-            'preference_name': log.preference_name,
-            'changes': log.changes,
-            'snapshot_before': log.snapshot_before,
-            'snapshot_after': log.snapshot_after,
-            'created_at': log.created_at.isoformat() if log.created_at else None,
+            **row,
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
         }
-        for log in page_queryset
+        for row in page_queryset
     ]
     return Response(
         {
-            'count': queryset.count(),
+            'count': paginator.page.paginator.count if page is not None else queryset.count(),
             'next': paginator.get_next_link() if page is not None else None,
             'previous': paginator.get_previous_link() if page is not None else None,
             'results': data,
@@ -836,10 +997,11 @@ def company_task_job_create_view(request):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def company_task_job_import_candidates_view(request):
-    spreadsheet_url = request.data.get('spreadsheet_url')
-    job_id_raw = request.data.get('job_id')
-    range_name = (request.data.get('range_name') or 'Sheet1!A1:Z1000').strip()
-    batch_size_raw = request.data.get('batch_size', 10)
+    payload = request.data
+    spreadsheet_url = payload.get('spreadsheet_url')
+    job_id_raw = payload.get('job_id')
+    range_name = (payload.get('range_name') or 'Sheet1!A1:Z1000').strip()
+    batch_size_raw = payload.get('batch_size', 10)
 
     errors = {}
     if not spreadsheet_url:
@@ -1000,47 +1162,7 @@ def company_task_job_import_candidates_view(request):
                 'failed': batch_failed,
             }
         )
-@authentication_classes([JWTAuthentication])
-@permission_classes([IsAuthenticated])
-def skill_gap_view(request, run_id):
-    run = MatchingRun.objects.filter(id=run_id, user=request.user).first()
-    if not run:
-        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-
-    if run.status != MatchingRun.STATUS_COMPLETED:
-        return Response(
-            {'detail': 'Skill gap analysis is only available for completed runs.'},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    from .services.skill_gap import analyze_skill_gaps
-    results = run.results.select_related('job').all()
-    resume_metadata = getattr(request.user, 'resume_metadata', None) or {}
-    analysis = analyze_skill_gaps(results, resume_metadata)
-    return Response(analysis, status=status.HTTP_200_OK)
-
 
-@api_view(['GET'])
-@authentication_classes([JWTAuthentication])
-@permission_classes([IsAuthenticated])
-def preference_history_view(request):
-    queryset = PreferenceChangeLog.objects.filter(user=request.user).order_by('-created_at')
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
-    page = paginator.paginate_queryset(queryset, request)
-    page_queryset = page if page is not None else queryset
-    data = [
-        {
-            'id': log.id,
-            'action': log.action,
-            'preference_name': log.preference_name,
-            'changes': log.changes,
-            'snapshot_before': log.snapshot_before,
-            'snapshot_after': log.snapshot_after,
-            'created_at': log.created_at.isoformat() if log.created_at else None,
-        }
-        for log in page_queryset
-    ]
     return Response(
         {
             'job_id': job.id,
@@ -1054,10 +1176,6 @@ def preference_history_view(request):
             'failed': failed_count,
             'batches': batch_summaries,
             'errors': errors_list,
-            'count': queryset.count(),
-            'next': paginator.get_next_link() if page is not None else None,
-            'previous': paginator.get_previous_link() if page is not None else None,
-            'results': data,
         },
         status=status.HTTP_200_OK,
     )
@@ -1073,7 +1191,6 @@ def company_task_job_preference_upsert_view(request):
     job_id = _coerce_int(payload.get('job_id'), 'job_id', errors, min_value=100)
 
     college_tiers = payload.get('college_tiers')
-    allowed_tiers = {item[0] for item in RECRUITER_COLLEGE_TIERS}
     normalized_tiers = []
     if not isinstance(college_tiers, list) or not college_tiers:
         errors['college_tiers'] = 'Must be a non-empty list.'
@@ -1084,8 +1201,8 @@ def company_task_job_preference_upsert_view(request):
                 errors['college_tiers'] = 'Each tier must be a string.'
                 break
             normalized = tier.strip().upper()
-            if normalized not in allowed_tiers:
-                errors['college_tiers'] = f'Allowed values: {sorted(allowed_tiers)}'
+            if normalized not in _VALID_COLLEGE_TIERS:
+                errors['college_tiers'] = f'Allowed values: {sorted(_VALID_COLLEGE_TIERS)}'
                 break
             if normalized in seen:
                 errors['college_tiers'] = 'Duplicate tiers are not allowed.'
@@ -1200,10 +1317,11 @@ def candidate_ranking_run_create_view(request):
             status=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
 
-    job_id = request.data.get('job_id')
-    batch_size_raw = request.data.get('batch_size', 20)
+    payload = request.data
+    job_id = payload.get('job_id')
+    batch_size_raw = payload.get('batch_size', 20)
     force_recompute = _coerce_bool(
-        request.data.get('force_recompute'),
+        payload.get('force_recompute'),
         'force_recompute',
         errors={},
         default=False,
@@ -1270,7 +1388,7 @@ def candidate_ranking_run_create_view(request):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def candidate_ranking_run_detail_view(request, run_id):
-    run = CandidateRankingRun.objects.filter(id=run_id).select_related('job').first()
+    run = CandidateRankingRun.objects.filter(id=run_id).first()
     if not run:
         return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -1289,50 +1407,64 @@ def candidate_ranking_run_detail_view(request, run_id):
 @permission_classes([IsAuthenticated])
 def candidate_ranking_run_list_view(request, job_id):
     run_queryset = CandidateRankingRun.objects.filter(job_id=job_id).order_by('-created_at')
-    paginator = PageNumberPagination()
-    paginator.page_size = 10
+    paginator = RunListPagination()
     page = paginator.paginate_queryset(run_queryset, request)
     page_queryset = page if page is not None else run_queryset
 
     return Response(
         {
-            'count': run_queryset.count(),
+            'count': paginator.page.paginator.count if page is not None else run_queryset.count(),
             'next': paginator.get_next_link() if page is not None else None,
             'previous': paginator.get_previous_link() if page is not None else None,
             'results': [_serialize_candidate_ranking_run(run) for run in page_queryset],
         },
         status=status.HTTP_200_OK,
     )
+
+
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def alerts_view(request):
-    queryset = JobAlert.objects.filter(user=request.user).select_related('job', 'preference')
+    queryset = JobAlert.objects.filter(user=request.user)
     unread_only = request.query_params.get('unread_only', '').lower()
-    if unread_only in ('true', '1', 'yes'):
+    if unread_only in _UNREAD_ONLY_VALUES:
         queryset = queryset.filter(is_read=False)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    # preference_name is denormalised onto the alert, so only the job is joined;
+    # rows come back as dicts of the columns listed below.
+    queryset = queryset.values(
+        'id',
+        'preference_name',
+        'match_score',
+        'match_reasons',
+        'is_read',
+        'created_at',
+        'job__job_id',
+        'job__title',
+        'job__company_name',
+    )
+
+    paginator = ActivityPagination()
     page = paginator.paginate_queryset(queryset, request)
     page_queryset = page if page is not None else queryset
     data = [
         {
-            'id': alert.id,
-            'job_id': alert.job.job_id,
-            'job_title': alert.job.title,
-            'company_name': alert.job.company_name,
-            'preference_name': alert.preference_name,
-            'match_score': to_json_safe(alert.match_score),
-            'match_reasons': alert.match_reasons,
-            'is_read': alert.is_read,
-            'created_at': alert.created_at.isoformat() if alert.created_at else None,
+            'id': row['id'],
+            'job_id': row['job__job_id'],
+            'job_title': row['job__title'],
+            'company_name': row['job__company_name'],
+            'preference_name': row['preference_name'],
+            'match_score': str(row['match_score']),
+            'match_reasons': row['match_reasons'],
+            'is_read': row['is_read'],
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
         }
-        for alert in page_queryset
+        for row in page_queryset
     ]
     return Response(
         {
-            'count': queryset.count(),
+            'count': paginator.page.paginator.count if page is not None else queryset.count(),
             'next': paginator.get_next_link() if page is not None else None,
             'previous': paginator.get_previous_link() if page is not None else None,
             'results': data,
@@ -1352,6 +1484,11 @@ def alerts_mark_read_view(request):
     else:
         if not isinstance(alert_ids, list):
             return Response({'alert_ids': 'Must be a list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(alert_ids) > MAX_MARK_READ_ALERT_IDS:
+            return Response(
+                {'alert_ids': f'Maximum {MAX_MARK_READ_ALERT_IDS} items allowed.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         updated = JobAlert.objects.filter(
             user=request.user, id__in=alert_ids, is_read=False
         ).update(is_read=True)
@@ -159,6 +159,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Agentic matching feature flag and infra configuration
 AGENT_MATCHING_ENABLED = os.getenv('AGENT_MATCHING_ENABLED', 'true').lower() == 'true'
+# How long identical normalized preferences reuse a filter_jobs result; 0 (the
+# default) disables it. Job writers other than load_jobs do not bump the cache
+# version, so their changes can take this long to show up.
+FILTER_JOBS_CACHE_SECONDS = int(os.getenv('FILTER_JOBS_CACHE_SECONDS', '0'))
 
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
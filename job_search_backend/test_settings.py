@@ -0,0 +1,62 @@
+"""
+Test settings for job_search_backend.
+
+Runs the test suite against an in-memory SQLite database and builds the
+schema straight from the models instead of replaying every migration.
+
+Usage:
+    python manage.py test --settings=job_search_backend.test_settings
+
+Test classes own their fixtures, so the suite can be sharded across worker
+processes; each worker gets its own copy of the in-memory database:
+    python manage.py test --settings=job_search_backend.test_settings --parallel auto
+
+An in-memory database cannot outlive the run, so --keepdb has no effect here.
+To reuse a test database between iterative runs, keep it on disk instead:
+    TEST_DATABASE_IN_MEMORY=false python manage.py test --settings=job_search_backend.test_settings --keepdb
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+# Set TEST_DATABASE_IN_MEMORY=false to run against the regular DATABASES
+# setting instead, e.g. when the suite is pointed at another backend in CI.
+if os.getenv('TEST_DATABASE_IN_MEMORY', 'true').lower() == 'true':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+            'TEST': {'NAME': ':memory:'},
+        }
+    }
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # SQLite would otherwise still build its test database in memory; give it
+    # a file so --keepdb has something to keep.
+    DATABASES['default'].setdefault('TEST', {'NAME': BASE_DIR / 'test_db.sqlite3'})
+
+
+class DisableMigrations:
+    """Report every app as having no migrations so tests use syncdb."""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+MIGRATION_MODULES = DisableMigrations()
+
+# Tests authenticate with force_authenticate, so the PBKDF2 work factor buys
+# nothing here.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Tests patch .delay where a task must run; anything that slips through lands
+# on an in-process broker instead of reaching for Redis.
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
+
+# filter_jobs caching is opt-in per deployment; keep it off regardless of the
+# environment so results never leak between test classes.
+FILTER_JOBS_CACHE_SECONDS = 0